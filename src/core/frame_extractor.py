@@ -5,13 +5,30 @@ Extracts individual frames from video files as PNG images for processing
 by the AI upscaler. Uses high-quality settings to preserve detail.
 """
 
+import hashlib
+import os
+import shutil
 import subprocess
 import threading
 import time
+from dataclasses import replace
 from pathlib import Path
 from typing import Callable, Optional
 
-from core.utils import get_ffmpeg_path, get_video_info, VideoInfo
+from core.utils import (
+    TRASH_MARKER,
+    discard_directory,
+    get_ffmpeg_path,
+    get_temp_directory,
+    get_video_info,
+    VideoInfo,
+)
+
+# Folder under the temp directory that keeps extracted frames between runs
+FRAME_CACHE_DIRNAME = "frame_cache"
+
+# Cached frames not used for this long are removed at startup (seconds)
+FRAME_CACHE_MAX_AGE = 7 * 24 * 60 * 60
 
 
 class FrameExtractionError(Exception):
@@ -19,6 +36,104 @@ class FrameExtractionError(Exception):
     pass
 
 
+def _source_fingerprint(input_path: Path, preview_fps: Optional[float] = None) -> str:
+    """Cheap fingerprint of a video from its name, size and mtime."""
+    stat = input_path.stat()
+    key = f"{stat.st_size}:{stat.st_mtime_ns}:{input_path.name}"
+    if preview_fps:
+        key += f":{preview_fps}"
+    return hashlib.blake2b(key.encode()).hexdigest()[:16]
+
+
+def cached_frames_directory(input_path: Path, preview_fps: Optional[float] = None) -> Path:
+    """
+    Get the directory that keeps a source's extracted frames between runs.
+
+    Extracting into it lets FrameExtractor reuse the frames when the same
+    source is processed again, e.g. at another scale or in a later session.
+    Only the most recently used source is kept: frames of any other source
+    are discarded here, so the cache never holds more than one video's
+    frames. prune_frame_cache() removes them once they go unused.
+
+    Args:
+        input_path: Path to the input video file.
+        preview_fps: Sampling rate the frames are extracted at, if any.
+
+    Returns:
+        Frame directory for this source (not created).
+    """
+    cache_root = get_temp_directory() / FRAME_CACHE_DIRNAME
+    key = _source_fingerprint(Path(input_path), preview_fps)
+
+    if cache_root.is_dir():
+        for entry in cache_root.iterdir():
+            # Keep this source's frames and fingerprint file; entries being
+            # discarded already belong to a deletion thread
+            if entry.name.startswith(key) or TRASH_MARKER in entry.name:
+                continue
+            if entry.is_dir():
+                discard_directory(entry)
+            else:
+                entry.unlink(missing_ok=True)
+
+    return cache_root / key
+
+
+def prune_frame_cache(max_age: float = FRAME_CACHE_MAX_AGE) -> None:
+    """
+    Remove cached frames that have not been used for max_age seconds.
+
+    Also finishes deleting cache entries an earlier session was discarding.
+    A cache entry was last used when its fingerprint file was written or
+    touched by FrameExtractor.
+
+    Args:
+        max_age: Age in seconds after which unused frames are removed.
+    """
+    cache_root = get_temp_directory() / FRAME_CACHE_DIRNAME
+    if not cache_root.is_dir():
+        return
+
+    cutoff = time.time() - max_age
+    for entry in cache_root.iterdir():
+        if TRASH_MARKER in entry.name:
+            shutil.rmtree(entry, ignore_errors=True)
+            continue
+        if not entry.is_dir():
+            continue
+
+        fingerprint_file = entry.with_name(entry.name + ".source_fingerprint")
+        try:
+            last_used = fingerprint_file.stat().st_mtime
+        except OSError:
+            # Never completed; judge by when extraction started
+            last_used = entry.stat().st_mtime
+        if last_used < cutoff:
+            fingerprint_file.unlink(missing_ok=True)
+            discard_directory(entry)
+
+
+def sampled_video_info(video_info: VideoInfo, preview_fps: Optional[float]) -> VideoInfo:
+    """
+    Describe the frame sequence extracted at preview_fps.
+
+    Args:
+        video_info: Metadata of the source video.
+        preview_fps: Sampling rate, or None for every frame.
+
+    Returns:
+        video_info with fps and frame_count for the sampled sequence, or
+        video_info itself if preview_fps is None or not below the source fps.
+    """
+    if not preview_fps or preview_fps >= video_info.fps:
+        return video_info
+    return replace(
+        video_info,
+        fps=preview_fps,
+        frame_count=max(1, round(video_info.duration * preview_fps))
+    )
+
+
 class FrameExtractor:
     """
     Handles extraction of video frames using FFmpeg.
@@ -31,7 +146,8 @@ class FrameExtractor:
         self,
         input_path: Path,
         output_dir: Path,
-        progress_callback: Optional[Callable[[int, int, str], None]] = None
+        progress_callback: Optional[Callable[[int, int, str], None]] = None,
+        preview_fps: Optional[float] = None
     ):
         """
         Initialize the frame extractor.
@@ -40,13 +156,24 @@ class FrameExtractor:
             input_path: Path to the input video file.
             output_dir: Directory to save extracted frames.
             progress_callback: Optional callback function(current, total, status).
+            preview_fps: Optional rate to sample frames at, e.g. for a quick
+                preview. Frames are still decoded but the dropped ones are
+                never PNG-encoded or upscaled. None extracts every frame.
         """
         self.input_path = input_path
         self.output_dir = output_dir
         self.progress_callback = progress_callback
+        self.preview_fps = preview_fps
         self._cancelled = False
         self._process: Optional[subprocess.Popen] = None
-        self._stderr_output = ""
+        self._stderr_lines: list[str] = []
+        self._frames_done = 0
+        self._total_frames = 0
+
+    @property
+    def stderr_output(self) -> str:
+        """Everything the process has written to stderr so far."""
+        return "".join(self._stderr_lines)
 
     def cancel(self) -> None:
         """Cancel the extraction process."""
@@ -59,15 +186,57 @@ class FrameExtractor:
 
     def _count_output_frames(self) -> int:
         """Count the number of frames in the output directory."""
-        if not self.output_dir.exists():
+        try:
+            with os.scandir(self.output_dir) as entries:
+                return sum(
+                    1 for entry in entries
+                    if entry.name.startswith("frame_") and entry.name.endswith(".png")
+                )
+        except FileNotFoundError:
             return 0
-        return len(list(self.output_dir.glob("frame_*.png")))
+
+    def _fingerprint_file(self) -> Path:
+        """
+        Path of the file recording which source the extracted frames came from.
+
+        Kept next to output_dir rather than inside it, because Real-ESRGAN
+        treats every file in its input directory as an image.
+        """
+        return self.output_dir.with_name(self.output_dir.name + ".source_fingerprint")
+
+    def _read_progress(self, pipe):
+        """
+        Parse FFmpeg's -progress key=value stream and report new frame counts.
+
+        Runs on its own thread so progress callbacks fire as FFmpeg reports
+        frames rather than on a polling timer.
+        """
+        try:
+            for line in pipe:
+                key, _, value = line.strip().partition("=")
+                if key != "frame":
+                    continue
+                try:
+                    frames_done = int(value)
+                except ValueError:
+                    continue
+
+                if frames_done != self._frames_done:
+                    self._frames_done = frames_done
+                    if self.progress_callback:
+                        self.progress_callback(
+                            frames_done,
+                            self._total_frames,
+                            f"Extracting frame {frames_done}/{self._total_frames}"
+                        )
+        except Exception:
+            pass
 
     def _read_stderr(self, pipe):
         """Read stderr in a separate thread to prevent blocking."""
         try:
             for line in pipe:
-                self._stderr_output += line
+                self._stderr_lines.append(line)
         except Exception:
             pass
 
@@ -82,14 +251,16 @@ class FrameExtractor:
             FrameExtractionError: If extraction fails.
         """
         self._cancelled = False
-        self._stderr_output = ""
+        self._stderr_lines = []
+        self._frames_done = 0
 
         # Ensure output directory exists
         self.output_dir.mkdir(parents=True, exist_ok=True)
 
         # Get video info for progress tracking
         try:
-            video_info = get_video_info(self.input_path)
+            source_info = get_video_info(self.input_path)
+            video_info = sampled_video_info(source_info, self.preview_fps)
             total_frames = video_info.frame_count
         except Exception as e:
             raise FrameExtractionError(f"Failed to get video info: {e}")
@@ -98,17 +269,72 @@ class FrameExtractor:
             # Estimate based on a typical video if frame count unknown
             total_frames = 1000  # Will be updated as frames are extracted
 
+        self._total_frames = total_frames
+
+        # Frames left by an earlier complete extraction of the same source
+        # (see cached_frames_directory) can be reused as-is. The fingerprint
+        # file records the source and how many frames that extraction wrote.
+        fingerprint = _source_fingerprint(self.input_path, self.preview_fps)
+        fingerprint_file = self._fingerprint_file()
+        try:
+            previous_fingerprint, _, previous_count = (
+                fingerprint_file.read_text().strip().partition(" ")
+            )
+        except OSError:
+            previous_fingerprint, previous_count = None, ""
+
+        if previous_fingerprint == fingerprint:
+            existing_frames = self._count_output_frames()
+            if existing_frames > 0 and str(existing_frames) == previous_count:
+                try:
+                    fingerprint_file.touch()  # Keeps prune_frame_cache() away
+                except OSError:
+                    pass
+                if self.progress_callback:
+                    self.progress_callback(
+                        existing_frames,
+                        existing_frames,
+                        f"Reusing {existing_frames} previously extracted frames"
+                    )
+                return existing_frames
+
+        # Any frames written from here on are not known to be complete
+        fingerprint_file.unlink(missing_ok=True)
+
+        # Start from an empty directory: leftovers of an interrupted run would
+        # be overwritten in place, and callers may already hold links to them
+        if any(self.output_dir.iterdir()):
+            if not discard_directory(self.output_dir, delete_in_place=False):
+                # Still in use, so it could not be moved aside; a background
+                # deletion here would race the frames about to be written
+                shutil.rmtree(self.output_dir, ignore_errors=True)
+            self.output_dir.mkdir(parents=True, exist_ok=True)
+
         ffmpeg_path = get_ffmpeg_path()
 
         # Build FFmpeg command for frame extraction
         # Using PNG format for lossless quality
+        # One file per frame because Real-ESRGAN-ncnn-vulkan only reads image
+        # files from a directory, not frames packed into a container
         # %08d ensures proper sorting (up to 99,999,999 frames)
         output_pattern = str(self.output_dir / "frame_%08d.png")
 
+        # Sampling at a lower rate drops frames right after decoding
+        sample_args = []
+        if video_info is not source_info:
+            sample_args = ["-vf", f"fps={self.preview_fps}"]
+
         cmd = [
             str(ffmpeg_path),
             "-i", str(self.input_path),
-            "-qscale:v", "2",           # High quality
+            *sample_args,
+            # Frames are temporary and only read back once by Real-ESRGAN, so
+            # favour encode speed over file size: PNG stays lossless either way
+            "-vcodec", "png",
+            "-compression_level", "1",  # Fastest zlib deflate
+            "-pred", "none",            # Skip per-row PNG prediction filters
+            "-progress", "pipe:1",      # Machine-readable progress on stdout
+            "-nostats",
             output_pattern,
             "-y"                         # Overwrite output files
         ]
@@ -118,15 +344,19 @@ class FrameExtractor:
 
         try:
             # Start FFmpeg process
-            # Use DEVNULL for stdout, capture stderr for errors
+            # Progress is reported on stdout, capture stderr for errors
             self._process = subprocess.Popen(
                 cmd,
-                stdout=subprocess.DEVNULL,
+                stdout=subprocess.PIPE,
                 stderr=subprocess.PIPE,
                 text=True,
                 creationflags=subprocess.CREATE_NO_WINDOW
             )
 
+            # cancel() may have run before the process handle was assigned
+            if self._cancelled:
+                self._process.terminate()
+
             # Read stderr in a separate thread to prevent blocking
             stderr_thread = threading.Thread(
                 target=self._read_stderr,
@@ -135,48 +365,45 @@ class FrameExtractor:
             )
             stderr_thread.start()
 
-            # Monitor progress by counting output files
-            last_count = 0
-
-            while self._process.poll() is None:
-                if self._cancelled:
-                    self._process.terminate()
-                    raise FrameExtractionError("Extraction cancelled by user")
-
-                # Count completed frames
-                current_count = self._count_output_frames()
-
-                if current_count != last_count:
-                    last_count = current_count
-
-                    if self.progress_callback:
-                        self.progress_callback(
-                            current_count,
-                            total_frames,
-                            f"Extracting frame {current_count}/{total_frames}"
-                        )
+            progress_thread = threading.Thread(
+                target=self._read_progress,
+                args=(self._process.stdout,),
+                daemon=True
+            )
+            progress_thread.start()
 
-                # Sleep briefly to avoid busy-waiting
-                time.sleep(0.1)
+            # Block until FFmpeg exits; progress arrives via the reader thread
+            # and cancel() terminates the process, which ends the wait
+            self._process.wait()
 
-            # Wait for stderr thread to finish
+            # Wait for reader threads to finish
             stderr_thread.join(timeout=2.0)
+            progress_thread.join(timeout=2.0)
+
+            if self._cancelled:
+                raise FrameExtractionError("Extraction cancelled by user")
 
             # Check return code
             if self._process.returncode != 0:
                 raise FrameExtractionError(
-                    f"FFmpeg extraction failed (code {self._process.returncode}):\n{self._stderr_output}"
+                    f"FFmpeg extraction failed (code {self._process.returncode}):\n{self.stderr_output}"
                 )
 
-            # Count actual extracted frames
-            extracted_frames = self._count_output_frames()
+            # FFmpeg's final progress report carries the exact frame count;
+            # fall back to counting files if it was never received
+            extracted_frames = self._frames_done or self._count_output_frames()
 
             if extracted_frames == 0:
                 raise FrameExtractionError(
                     f"No frames were extracted. The video may be corrupted or empty.\n"
-                    f"Details: {self._stderr_output}"
+                    f"Details: {self.stderr_output}"
                 )
 
+            try:
+                fingerprint_file.write_text(f"{fingerprint} {extracted_frames}")
+            except OSError:
+                pass  # Only costs a re-extraction next time
+
             if self.progress_callback:
                 self.progress_callback(
                     extracted_frames,
@@ -195,7 +422,8 @@ class FrameExtractor:
 def extract_frames(
     input_path: Path,
     output_dir: Path,
-    progress_callback: Optional[Callable[[int, int, str], None]] = None
+    progress_callback: Optional[Callable[[int, int, str], None]] = None,
+    preview_fps: Optional[float] = None
 ) -> int:
     """
     Convenience function to extract frames from a video.
@@ -204,9 +432,10 @@ def extract_frames(
         input_path: Path to the input video file.
         output_dir: Directory to save extracted frames.
         progress_callback: Optional callback function(current, total, status).
+        preview_fps: Optional rate to sample frames at; None extracts all.
 
     Returns:
         Number of frames extracted.
     """
-    extractor = FrameExtractor(input_path, output_dir, progress_callback)
+    extractor = FrameExtractor(input_path, output_dir, progress_callback, preview_fps)
     return extractor.extract()
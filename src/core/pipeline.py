@@ -0,0 +1,492 @@
+"""
+Headless upscaling pipeline.
+
+Chains frame extraction, AI upscaling and video assembly into a single call
+without any Qt dependency. Real-ESRGAN-ncnn-vulkan only reads and writes image
+files, so frames still pass through PNG directories. Extracted frames are kept
+in the frame cache (see cached_frames_directory) so the same source can be
+processed again without re-extracting; every other intermediate is deleted as
+soon as the next stage has consumed it.
+
+pipeline_upscale() runs the stages one after another; ThreadedPipeline runs
+them concurrently on rolling batches of frames.
+"""
+
+import os
+import shutil
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Callable, Iterator, Optional
+
+from core.utils import discard_directory, get_temp_directory, get_video_info
+from core.frame_extractor import (
+    FrameExtractor,
+    cached_frames_directory,
+    sampled_video_info,
+)
+from core.upscaler import Upscaler, default_batch_size
+from core.video_assembler import VideoAssembler, VideoAssemblyError
+
+
+def pipeline_upscale(
+    input_video: Path,
+    output_video: Path,
+    scale: int = 2,
+    model_name: str = "realesr-animevideov3",
+    progress_callback: Optional[Callable[[int, int, str], None]] = None,
+    skip_duplicates: bool = False
+) -> Path:
+    """
+    Upscale a video end to end: extract, upscale, then re-encode with audio.
+
+    Args:
+        input_video: Path to the input video file.
+        output_video: Path for the output video file.
+        scale: Upscale factor (2, 3, or 4).
+        model_name: Name of the Real-ESRGAN model to use.
+        progress_callback: Optional callback function(current, total, status).
+        skip_duplicates: Upscale byte-identical frames only once
+            (see Upscaler).
+
+    Returns:
+        Path to the output video file.
+
+    Raises:
+        FrameExtractionError, UpscalingError, VideoAssemblyError: If a stage fails.
+    """
+    input_video = Path(input_video)
+    output_video = Path(output_video)
+    video_info = get_video_info(input_video)
+
+    input_dir = cached_frames_directory(input_video)
+    job_dir = get_temp_directory() / f"job_{int(time.time() * 1000)}"
+    output_dir = job_dir / "output_frames"
+
+    try:
+        FrameExtractor(input_video, input_dir, progress_callback).extract()
+
+        Upscaler(
+            input_dir, output_dir, scale, model_name, progress_callback,
+            skip_duplicates=skip_duplicates
+        ).upscale()
+
+        return VideoAssembler(
+            output_dir, input_video, output_video, video_info, progress_callback
+        ).assemble()
+    finally:
+        discard_directory(job_dir)
+
+
+# Queue sentinel marking the end of a stage's output
+_END = object()
+
+
+class BoundedSpscQueue:
+    """
+    Bounded single-producer/single-consumer queue that can be closed.
+
+    Items are kept in a deque, whose append() and popleft() are atomic, so
+    with one producer and one consumer neither end takes a lock while the
+    queue is neither full nor empty. The not_empty/not_full events are only
+    cleared and waited on when an end has to block, and only set when the
+    other end may be waiting. close() wakes both ends immediately, so a
+    stopping pipeline never has to poll its hand-offs with timeouts.
+    """
+
+    def __init__(self, maxsize: int):
+        self._items: deque = deque()
+        self._maxsize = maxsize
+        self._closed = False
+        self._not_empty = threading.Event()
+        self._not_full = threading.Event()
+        self._not_full.set()
+
+    def put(self, item) -> bool:
+        """Add an item, blocking while full. Returns False if the queue is closed."""
+        while not self._closed:
+            if len(self._items) < self._maxsize:
+                self._items.append(item)
+                # Checked after the append: a consumer that clears the event
+                # later re-checks the deque and sees the item
+                if not self._not_empty.is_set():
+                    self._not_empty.set()
+                return True
+
+            self._not_full.clear()
+            # get() may have made room between the check and the clear
+            if len(self._items) >= self._maxsize and not self._closed:
+                self._not_full.wait()
+        return False
+
+    def get(self):
+        """Remove the next item, blocking while empty. Returns _END once closed."""
+        while not self._closed:
+            try:
+                item = self._items.popleft()
+            except IndexError:
+                self._not_empty.clear()
+                # put() may have added an item between the pop and the clear
+                if not self._items and not self._closed:
+                    self._not_empty.wait()
+                continue
+
+            if not self._not_full.is_set():
+                self._not_full.set()
+            return item
+        return _END
+
+    def close(self) -> None:
+        """Close the queue, discarding queued items and waking both ends."""
+        self._closed = True
+        self._items.clear()
+        self._not_empty.set()
+        self._not_full.set()
+
+
+def _frame_name(index: int) -> str:
+    """File name FFmpeg's frame_%08d.png pattern gives the 1-based frame index."""
+    return f"frame_{index:08d}.png"
+
+
+class ThreadedPipeline:
+    """
+    Runs extraction, upscaling and encoding concurrently.
+
+    FFmpeg extracts frames into a staging directory; as soon as a full batch
+    is on disk it is moved into its own batch_NNN/ directory and queued for
+    Real-ESRGAN. Upscaled batches are queued for a single FFmpeg encoder that
+    reads them over stdin. The bounded queues between stages give
+    back-pressure, so at most `prefetch` batches wait at each hand-off and the
+    GPU starts working after the first batch instead of after the whole video.
+    """
+
+    def __init__(
+        self,
+        input_video: Path,
+        output_video: Path,
+        scale: int = 2,
+        model_name: str = "realesr-animevideov3",
+        progress_callback: Optional[Callable[[int, int, str], None]] = None,
+        prefetch: int = 8,
+        batch_size: Optional[int] = None,
+        stage_callback: Optional[Callable[[str, int, int, str], None]] = None,
+        preview_fps: Optional[float] = None,
+        skip_duplicates: bool = False
+    ):
+        """
+        Initialize the pipeline.
+
+        Args:
+            input_video: Path to the input video file.
+            output_video: Path for the output video file.
+            scale: Upscale factor (2, 3, or 4).
+            model_name: Name of the Real-ESRGAN model to use.
+            progress_callback: Optional callback function(current, total, status),
+                reporting upscaled frames (the bottleneck stage).
+            prefetch: Maximum number of batches queued between two stages.
+            batch_size: Number of frames per Real-ESRGAN invocation. Defaults
+                to default_batch_size().
+            stage_callback: Optional callback function(stage, current, total,
+                status) reporting each stage's own progress, where stage is
+                "extract", "upscale" or "assemble". Stages overlap, so calls
+                for different stages interleave and come from several threads.
+            preview_fps: Optional rate to sample the source at; the output is
+                encoded at that rate. None processes every frame.
+            skip_duplicates: Upscale byte-identical frames only once. Repeats
+                are only found within a batch.
+        """
+        self.input_video = Path(input_video)
+        self.output_video = Path(output_video)
+        self.scale = scale
+        self.model_name = model_name
+        self.progress_callback = progress_callback
+        self.prefetch = prefetch
+        self.batch_size = batch_size or default_batch_size()
+        self.stage_callback = stage_callback
+        self.preview_fps = preview_fps
+        self.skip_duplicates = skip_duplicates
+
+        self._cancelled = False
+        self._stopping = False
+        self._error: Optional[Exception] = None
+
+        self._extractor: Optional[FrameExtractor] = None
+        self._upscaler: Optional[Upscaler] = None
+        self._assembler: Optional[VideoAssembler] = None
+
+        # Hand-offs between stages (created per run)
+        self._extract_q: Optional[BoundedSpscQueue] = None
+        self._write_q: Optional[BoundedSpscQueue] = None
+
+        # Extraction state shared with the batcher thread
+        self._extract_cond = threading.Condition()
+        self._frames_extracted = 0
+        self._extraction_done = False
+
+        self._total_frames = 0
+        self._frames_upscaled = 0
+
+    def cancel(self) -> None:
+        """Cancel the pipeline; run() raises once all stages have stopped."""
+        self._cancelled = True
+        self._stop()
+
+    def _stop(self) -> None:
+        """Stop every stage and wake any thread blocked on a hand-off."""
+        self._stopping = True
+        for component in (self._extractor, self._upscaler, self._assembler):
+            if component is not None:
+                component.cancel()
+        for q in (self._extract_q, self._write_q):
+            if q is not None:
+                q.close()
+        with self._extract_cond:
+            self._extract_cond.notify_all()
+
+    def _fail(self, error: Exception) -> None:
+        """Record the first stage failure and stop the other stages."""
+        if self._error is None:
+            self._error = error
+        self._stop()
+
+    def _on_extract_progress(self, current: int, total: int, message: str) -> None:
+        with self._extract_cond:
+            self._frames_extracted = max(self._frames_extracted, current)
+            self._extract_cond.notify_all()
+        if self.stage_callback:
+            self.stage_callback("extract", current, total, message)
+
+    def _on_upscale_progress(self, current: int, total: int, message: str) -> None:
+        done = self._frames_upscaled + current
+        total = max(self._total_frames, done)
+        status = f"Upscaling frame {done}/{total}"
+        if self.progress_callback:
+            self.progress_callback(done, total, status)
+        if self.stage_callback:
+            self.stage_callback("upscale", done, total, status)
+
+    def _on_assemble_progress(self, current: int, total: int, message: str) -> None:
+        if self.stage_callback:
+            self.stage_callback("assemble", current, total, message)
+
+    def _run_extractor(self) -> None:
+        if self._stopping:
+            return
+        try:
+            count = self._extractor.extract()
+            with self._extract_cond:
+                self._frames_extracted = count
+                self._extraction_done = True
+                self._extract_cond.notify_all()
+        except Exception as e:
+            self._fail(e)
+
+    def _run_batcher(self, staging_dir: Path, job_dir: Path, extract_q: BoundedSpscQueue) -> None:
+        """
+        Hand completed frames from the staging directory over in batches.
+
+        Frames are hard-linked into each batch so the staging directory stays
+        a complete frame cache. Where linking is not supported they are moved
+        instead, which leaves the cache incomplete and makes the next run
+        re-extract.
+        """
+        try:
+            batch_index = 0
+            next_frame = 1
+
+            while True:
+                batch_end = next_frame + self.batch_size - 1
+
+                with self._extract_cond:
+                    while not (self._stopping or self._extraction_done):
+                        # The image2 muxer writes frames one after another, so
+                        # a frame is complete once its successor exists
+                        if (self._frames_extracted > batch_end
+                                and (staging_dir / _frame_name(batch_end + 1)).exists()):
+                            break
+                        self._extract_cond.wait(timeout=1.0)
+
+                    if self._stopping:
+                        return
+                    if self._extraction_done:
+                        batch_end = min(batch_end, self._frames_extracted)
+
+                if next_frame > batch_end:
+                    return
+
+                batch_dir = job_dir / f"batch_{batch_index:03d}"
+                batch_dir.mkdir()
+                for index in range(next_frame, batch_end + 1):
+                    name = _frame_name(index)
+                    try:
+                        os.link(staging_dir / name, batch_dir / name)
+                    except OSError:
+                        (staging_dir / name).rename(batch_dir / name)
+
+                if not extract_q.put(batch_dir):
+                    return
+
+                next_frame = batch_end + 1
+                batch_index += 1
+        except Exception as e:
+            self._fail(e)
+        finally:
+            extract_q.put(_END)
+
+    def _run_upscaler(self, extract_q: BoundedSpscQueue, write_q: BoundedSpscQueue) -> None:
+        """Upscale each queued batch with its own Real-ESRGAN invocation."""
+        try:
+            while True:
+                batch_dir = extract_q.get()
+                if batch_dir is _END:
+                    return
+
+                output_dir = batch_dir.with_name(f"{batch_dir.name}_out")
+                self._upscaler = Upscaler(
+                    batch_dir,
+                    output_dir,
+                    self.scale,
+                    self.model_name,
+                    self._on_upscale_progress,
+                    self.batch_size,
+                    self.skip_duplicates
+                )
+                if self._stopping:
+                    return
+
+                self._frames_upscaled += self._upscaler.upscale()
+                shutil.rmtree(batch_dir, ignore_errors=True)
+
+                if not write_q.put(output_dir):
+                    return
+        except Exception as e:
+            self._fail(e)
+        finally:
+            write_q.put(_END)
+
+    def _upscaled_frames(self, write_q: BoundedSpscQueue) -> Iterator[Path]:
+        """Yield upscaled frame paths in display order as batches complete."""
+        while True:
+            output_dir = write_q.get()
+            if output_dir is _END:
+                return
+            yield from sorted(output_dir.glob("frame_*.png"))
+            shutil.rmtree(output_dir, ignore_errors=True)
+
+    def run(self) -> Path:
+        """
+        Run all stages to completion.
+
+        Returns:
+            Path to the output video file.
+
+        Raises:
+            FrameExtractionError, UpscalingError, VideoAssemblyError: If a stage
+                fails or the pipeline is cancelled.
+        """
+        # The cancel flags are deliberately not reset here: a cancel() that
+        # lands before run() must still stop the job
+        if self._cancelled:
+            raise VideoAssemblyError("Assembly cancelled by user")
+
+        self._error = None
+        self._frames_extracted = 0
+        self._extraction_done = False
+        self._frames_upscaled = 0
+
+        video_info = sampled_video_info(
+            get_video_info(self.input_video), self.preview_fps
+        )
+        self._total_frames = video_info.frame_count
+
+        staging_dir = cached_frames_directory(self.input_video, self.preview_fps)
+        job_dir = get_temp_directory() / f"job_{int(time.time() * 1000)}"
+        job_dir.mkdir(parents=True)
+
+        extract_q = self._extract_q = BoundedSpscQueue(self.prefetch)
+        write_q = self._write_q = BoundedSpscQueue(self.prefetch)
+
+        self._extractor = FrameExtractor(
+            self.input_video, staging_dir, self._on_extract_progress, self.preview_fps
+        )
+        self._assembler = VideoAssembler.from_frame_iterator(
+            self._upscaled_frames(write_q),
+            self.input_video,
+            self.output_video,
+            video_info,
+            self._on_assemble_progress,
+            total_frames=self._total_frames
+        )
+
+        # cancel() may have run while the stages were being set up
+        if self._stopping:
+            self._stop()
+
+        threads = [
+            threading.Thread(target=self._run_extractor, daemon=True),
+            threading.Thread(
+                target=self._run_batcher,
+                args=(staging_dir, job_dir, extract_q),
+                daemon=True
+            ),
+            threading.Thread(
+                target=self._run_upscaler,
+                args=(extract_q, write_q),
+                daemon=True
+            ),
+        ]
+
+        if self.progress_callback:
+            self.progress_callback(0, self._total_frames, "Starting pipeline...")
+
+        try:
+            for thread in threads:
+                thread.start()
+
+            if not self._stopping:
+                try:
+                    output_path = self._assembler.assemble()
+                except Exception as e:
+                    self._fail(e)
+
+            for thread in threads:
+                thread.join()
+
+            if self._error is not None:
+                raise self._error
+            if self._cancelled:
+                raise VideoAssemblyError("Assembly cancelled by user")
+            return output_path
+        finally:
+            self._stop()
+            discard_directory(job_dir)
+
+
+def process_video_threads(
+    input_video: Path,
+    output_video: Path,
+    scale: int = 2,
+    progress_callback: Optional[Callable[[int, int, str], None]] = None,
+    prefetch: int = 8,
+    model_name: str = "realesr-animevideov3"
+) -> Path:
+    """
+    Convenience function to upscale a video with overlapping stages.
+
+    Args:
+        input_video: Path to the input video file.
+        output_video: Path for the output video file.
+        scale: Upscale factor (2, 3, or 4).
+        progress_callback: Optional callback function(current, total, status).
+        prefetch: Maximum number of batches queued between two stages.
+        model_name: Name of the Real-ESRGAN model to use.
+
+    Returns:
+        Path to the output video file.
+    """
+    pipeline = ThreadedPipeline(
+        input_video, output_video, scale, model_name, progress_callback, prefetch
+    )
+    return pipeline.run()
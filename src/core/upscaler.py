@@ -5,10 +5,12 @@ Wraps the Real-ESRGAN-ncnn-vulkan executable to perform AI-based image
 upscaling on extracted video frames. Supports 2x, 3x, and 4x scale factors.
 """
 
+import hashlib
+import shutil
 import subprocess
 import os
-import time
 import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Callable, Optional
 
@@ -20,25 +22,61 @@ class UpscalingError(Exception):
     pass
 
 
+def default_batch_size() -> int:
+    """
+    Get the number of frames per batch for callers that upscale in batches.
+
+    Defaults to Upscaler.DEFAULT_BATCH_SIZE and can be overridden with the
+    VIDEO_UPSCALER_BATCH_SIZE environment variable.
+    """
+    try:
+        batch_size = int(os.environ.get("VIDEO_UPSCALER_BATCH_SIZE", ""))
+    except ValueError:
+        return Upscaler.DEFAULT_BATCH_SIZE
+    return batch_size if batch_size > 0 else Upscaler.DEFAULT_BATCH_SIZE
+
+
+def _file_digest(path: Path) -> bytes:
+    """Hash a frame file's contents."""
+    with open(path, "rb") as f:
+        return hashlib.blake2b(f.read(), digest_size=16).digest()
+
+
 class Upscaler:
     """
     Handles AI-based frame upscaling using Real-ESRGAN-ncnn-vulkan.
 
-    The upscaler processes frames in batch mode for efficiency, monitoring
-    output directory for progress tracking since Real-ESRGAN doesn't provide
-    per-frame progress output.
+    All frames normally go through a single Real-ESRGAN invocation, so the
+    model is loaded once. Progress comes from the per-frame "done" lines
+    Real-ESRGAN prints to stderr in verbose mode. If the GPU runs out of
+    memory, only the unfinished frames are rerun with a smaller tile size.
+    Byte-identical repeated frames can optionally be upscaled once and
+    shared (skip_duplicates, off by default).
     """
 
     # Valid scale factors for Real-ESRGAN
     VALID_SCALES = {2, 3, 4}
 
+    # Frames per batch for callers that split work into batches
+    DEFAULT_BATCH_SIZE = 256
+
+    # Real-ESRGAN load:proc:save thread counts; extra load/save threads keep
+    # PNG decode and encode from starving the GPU
+    THREAD_COUNTS = "2:2:2"
+
+    # Tile sizes tried in order, stepping down each time the GPU runs out of
+    # memory (0 lets Real-ESRGAN pick from the available VRAM)
+    TILE_SIZES = (0, 64, 32)
+
     def __init__(
         self,
         input_dir: Path,
         output_dir: Path,
         scale: int = 2,
         model_name: str = "realesr-animevideov3",
-        progress_callback: Optional[Callable[[int, int, str], None]] = None
+        progress_callback: Optional[Callable[[int, int, str], None]] = None,
+        batch_size: Optional[int] = None,
+        skip_duplicates: bool = False
     ):
         """
         Initialize the upscaler.
@@ -50,6 +88,14 @@ class Upscaler:
             model_name: Name of the Real-ESRGAN model to use.
                        realesr-animevideov3 supports 2x, 3x, 4x.
             progress_callback: Optional callback function(current, total, status).
+            batch_size: Optional frames per Real-ESRGAN invocation. By default
+                all frames go through a single invocation so the Vulkan
+                context and model weights are only loaded once.
+            skip_duplicates: Upscale byte-identical input frames (static
+                shots, title cards, held animation frames) only once and
+                copy the result for the repeats. Only frames whose file
+                sizes collide are hashed, but it is still an extra pass over
+                the frames, so it is off by default.
 
         Raises:
             ValueError: If scale factor is invalid.
@@ -65,9 +111,21 @@ class Upscaler:
         self.scale = scale
         self.model_name = model_name
         self.progress_callback = progress_callback
+        self.batch_size = batch_size
+        self.skip_duplicates = skip_duplicates
         self._cancelled = False
         self._process: Optional[subprocess.Popen] = None
-        self._stderr_output = ""
+        self._stderr_lines: list[str] = []
+        self._total_frames = 0
+        self._tile_index = 0
+        # Names of input frames Real-ESRGAN has reported as saved; its size
+        # is the progress count, so a frame reported twice counts once
+        self._completed: set[str] = set()
+
+    @property
+    def stderr_output(self) -> str:
+        """Everything the process has written to stderr so far."""
+        return "".join(self._stderr_lines)
 
     def cancel(self) -> None:
         """Cancel the upscaling process."""
@@ -80,30 +138,234 @@ class Upscaler:
 
     def _count_output_frames(self) -> int:
         """Count the number of frames in the output directory."""
-        if not self.output_dir.exists():
+        try:
+            with os.scandir(self.output_dir) as entries:
+                return sum(
+                    1 for entry in entries
+                    if entry.name.startswith("frame_") and entry.name.endswith(".png")
+                )
+        except FileNotFoundError:
             return 0
-        return len(list(self.output_dir.glob("frame_*.png")))
 
     def _read_stderr(self, pipe):
-        """Read stderr in a separate thread to prevent blocking."""
+        """
+        Read stderr in a separate thread to prevent blocking.
+
+        In verbose mode Real-ESRGAN prints "<input> -> <output> done" once per
+        saved frame, which drives the progress callback and records which
+        input frames are finished.
+        """
         try:
             for line in pipe:
-                self._stderr_output += line
+                self._stderr_lines.append(line)
+                if line.rstrip().endswith(" done"):
+                    input_path = line.rsplit(" -> ", 1)[0].strip()
+                    self._completed.add(Path(input_path).name)
+                    frames_done = len(self._completed)
+                    if self.progress_callback:
+                        self.progress_callback(
+                            frames_done,
+                            self._total_frames,
+                            f"Upscaling frame {frames_done}/{self._total_frames}"
+                        )
         except Exception:
             pass
 
+    def _run_realesrgan(self, input_dir: Path) -> int:
+        """
+        Run one Real-ESRGAN invocation over input_dir.
+
+        Returns:
+            The process return code.
+
+        Raises:
+            UpscalingError: If the run was cancelled.
+        """
+        self._stderr_lines = []
+
+        # Build Real-ESRGAN command
+        # -i: input directory
+        # -o: output directory
+        # -n: model name
+        # -s: scale factor
+        # -t: tile size (0 = auto from available GPU memory)
+        # -j: load:proc:save thread counts
+        # -f: output format (png for quality)
+        # -v: verbose output
+        cmd = [
+            str(get_realesrgan_path()),
+            "-i", str(input_dir),
+            "-o", str(self.output_dir),
+            "-n", self.model_name,
+            "-s", str(self.scale),
+            "-t", str(self.TILE_SIZES[self._tile_index]),
+            "-j", self.THREAD_COUNTS,
+            "-f", "png",
+            "-m", str(get_models_directory()),
+            "-v"  # Verbose mode: per-frame "done" lines drive progress
+        ]
+
+        # Start Real-ESRGAN process
+        # Use DEVNULL for stdout to prevent buffer issues
+        # Capture stderr for error messages
+        self._process = subprocess.Popen(
+            cmd,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            text=True,
+            creationflags=subprocess.CREATE_NO_WINDOW
+        )
+
+        # cancel() may have run before the process handle was assigned
+        if self._cancelled:
+            self._process.terminate()
+
+        # Read stderr in a separate thread to prevent blocking
+        stderr_thread = threading.Thread(
+            target=self._read_stderr,
+            args=(self._process.stderr,),
+            daemon=True
+        )
+        stderr_thread.start()
+
+        # Block until Real-ESRGAN exits; progress arrives via the stderr
+        # reader and cancel() terminates the process, which ends the wait
+        self._process.wait()
+
+        # Wait for stderr thread to finish
+        stderr_thread.join(timeout=2.0)
+
+        if self._cancelled:
+            raise UpscalingError("Upscaling cancelled by user")
+
+        return self._process.returncode
+
+    def _upscale_batch(self, input_dir: Path) -> None:
+        """
+        Upscale every frame in input_dir, retrying with smaller tiles on OOM.
+
+        Raises:
+            UpscalingError: If Real-ESRGAN fails.
+        """
+        returncode = self._run_realesrgan(input_dir)
+        if returncode == 0:
+            return
+
+        stderr = self.stderr_output
+
+        # Check for common error patterns
+        if "vkCreateInstance" in stderr or "vulkan" in stderr.lower():
+            raise UpscalingError(
+                "Vulkan GPU initialization failed.\n\n"
+                "Please ensure:\n"
+                "1. Your GPU supports Vulkan\n"
+                "2. GPU drivers are up to date\n"
+                "3. No other GPU-intensive applications are running"
+            )
+        elif "memory" in stderr.lower():
+            if self._tile_index + 1 < len(self.TILE_SIZES):
+                # Smaller tiles need less VRAM; rerun only the frames that
+                # were not finished and keep the smaller size from now on
+                self._tile_index += 1
+                pending = [
+                    frame for frame in input_dir.glob("frame_*.png")
+                    if frame.name not in self._completed
+                ]
+                self._upscale_moved(pending, input_dir / "retry")
+                return
+            raise UpscalingError(
+                "GPU ran out of memory.\n\n"
+                "Try closing other applications or using a lower resolution video."
+            )
+        else:
+            raise UpscalingError(
+                f"Real-ESRGAN failed (code {returncode}):\n{stderr}"
+            )
+
+    def _upscale_moved(self, frames: list[Path], batch_dir: Path) -> None:
+        """
+        Upscale a subset of frames.
+
+        Real-ESRGAN takes a whole directory, so the frames are moved into
+        batch_dir for the run and moved back afterwards.
+        """
+        batch_dir.mkdir(exist_ok=True)
+        for frame in frames:
+            frame.rename(batch_dir / frame.name)
+        try:
+            self._upscale_batch(batch_dir)
+        finally:
+            for frame in frames:
+                (batch_dir / frame.name).rename(frame)
+            batch_dir.rmdir()
+
+    def _find_duplicates(self, frames: list[Path]) -> dict[Path, Path]:
+        """
+        Map each repeated frame to the first frame with identical contents.
+
+        FFmpeg encodes identical decoded frames to identical PNG files, so
+        comparing file hashes finds exact repeats without decoding anything.
+        Only frames sharing a file size can be identical, so frames with a
+        unique size are never read.
+        """
+        by_size: dict[int, list[Path]] = {}
+        for frame in frames:
+            by_size.setdefault(frame.stat().st_size, []).append(frame)
+        candidates = [
+            frame for group in by_size.values() if len(group) > 1 for frame in group
+        ]
+        if not candidates:
+            return {}
+
+        workers = min(8, os.cpu_count() or 1)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            digests = executor.map(_file_digest, candidates)
+
+            first_seen: dict[bytes, Path] = {}
+            duplicates: dict[Path, Path] = {}
+            for frame, digest in zip(candidates, digests):
+                original = first_seen.setdefault(digest, frame)
+                if original is not frame:
+                    duplicates[frame] = original
+        return duplicates
+
+    def _copy_duplicate_outputs(self, duplicates: dict[Path, Path]) -> None:
+        """Give each repeated frame the upscaled output of its original."""
+        for frame, original in duplicates.items():
+            source = self.output_dir / original.name
+            target = self.output_dir / frame.name
+            try:
+                # A hard link costs no extra disk space; readers never modify frames
+                os.link(source, target)
+            except FileExistsError:
+                pass
+            except OSError:
+                if source.exists():
+                    shutil.copyfile(source, target)
+
     def upscale(self) -> int:
         """
         Upscale all frames in the input directory.
 
+        A single Real-ESRGAN process handles every frame unless batch_size
+        is set. If the GPU runs out of memory, only the unfinished frames are
+        rerun with a smaller tile size.
+
         Returns:
             Number of frames upscaled.
 
         Raises:
-            UpscalingError: If upscaling fails.
+            UpscalingError: If upscaling fails or cancel() has been called.
         """
-        self._cancelled = False
-        self._stderr_output = ""
+        # A cancel() that arrived before this call (e.g. while the pipeline
+        # was handing over the batch) must not be lost, so the flag is
+        # never reset here
+        if self._cancelled:
+            raise UpscalingError("Upscaling cancelled by user")
+
+        self._stderr_lines = []
+        self._tile_index = 0
+        self._completed = set()
 
         # Ensure output directory exists
         self.output_dir.mkdir(parents=True, exist_ok=True)
@@ -115,113 +377,55 @@ class Upscaler:
             raise UpscalingError(str(e))
 
         # Count input frames
-        input_frames = list(self.input_dir.glob("frame_*.png"))
+        input_frames = sorted(self.input_dir.glob("frame_*.png"))
         total_frames = len(input_frames)
+        self._total_frames = total_frames
 
         if total_frames == 0:
             raise UpscalingError(
                 f"No frames found in input directory: {self.input_dir}"
             )
 
-        realesrgan_path = get_realesrgan_path()
-        models_dir = get_models_directory()
-
-        # Build Real-ESRGAN command
-        # -i: input directory
-        # -o: output directory
-        # -n: model name
-        # -s: scale factor
-        # -f: output format (png for quality)
-        # -v: verbose output
-        cmd = [
-            str(realesrgan_path),
-            "-i", str(self.input_dir),
-            "-o", str(self.output_dir),
-            "-n", self.model_name,
-            "-s", str(self.scale),
-            "-f", "png",
-            "-m", str(models_dir),
-            "-v"  # Verbose mode for better debugging
+        # Repeated frames wait in a sibling directory (Real-ESRGAN reads
+        # everything in its input directory) and count as done up front
+        duplicates: dict[Path, Path] = {}
+        duplicates_dir = self.input_dir.with_name(self.input_dir.name + "_duplicates")
+        if self.skip_duplicates and total_frames > 1:
+            duplicates = self._find_duplicates(input_frames)
+        if duplicates:
+            duplicates_dir.mkdir(exist_ok=True)
+            for frame in duplicates:
+                frame.rename(duplicates_dir / frame.name)
+                self._completed.add(frame.name)
+            input_frames = [frame for frame in input_frames if frame not in duplicates]
+
+        unique_frames = len(input_frames)
+        batch_size = self.batch_size or unique_frames
+        batches = [
+            input_frames[i:i + batch_size]
+            for i in range(0, unique_frames, batch_size)
         ]
 
         if self.progress_callback:
-            self.progress_callback(0, total_frames, "Starting AI upscaling...")
+            status = "Starting AI upscaling..."
+            if duplicates:
+                status = f"Starting AI upscaling ({len(duplicates)} repeated frames skipped)..."
+            self.progress_callback(len(duplicates), total_frames, status)
 
         try:
-            # Start Real-ESRGAN process
-            # Use DEVNULL for stdout to prevent buffer issues
-            # Capture stderr for error messages
-            self._process = subprocess.Popen(
-                cmd,
-                stdout=subprocess.DEVNULL,
-                stderr=subprocess.PIPE,
-                text=True,
-                creationflags=subprocess.CREATE_NO_WINDOW
-            )
-
-            # Read stderr in a separate thread to prevent blocking
-            stderr_thread = threading.Thread(
-                target=self._read_stderr,
-                args=(self._process.stderr,),
-                daemon=True
-            )
-            stderr_thread.start()
-
-            # Monitor progress by counting output files
-            last_count = 0
-
-            while self._process.poll() is None:
-                if self._cancelled:
-                    self._process.terminate()
-                    raise UpscalingError("Upscaling cancelled by user")
-
-                # Count completed frames
-                current_count = self._count_output_frames()
-
-                if current_count != last_count:
-                    last_count = current_count
-
-                    if self.progress_callback:
-                        self.progress_callback(
-                            current_count,
-                            total_frames,
-                            f"Upscaling frame {current_count}/{total_frames}"
-                        )
+            if len(batches) == 1:
+                self._upscale_batch(self.input_dir)
+            else:
+                for index, batch in enumerate(batches):
+                    self._upscale_moved(batch, self.input_dir / f"batch_{index:04d}")
 
-                # Sleep briefly to avoid busy-waiting
-                time.sleep(0.25)
-
-            # Wait for stderr thread to finish
-            stderr_thread.join(timeout=2.0)
-
-            # Process completed - check return code
-            if self._process.returncode != 0:
-                stderr = self._stderr_output
-
-                # Check for common error patterns
-                if "vkCreateInstance" in stderr or "vulkan" in stderr.lower():
-                    raise UpscalingError(
-                        "Vulkan GPU initialization failed.\n\n"
-                        "Please ensure:\n"
-                        "1. Your GPU supports Vulkan\n"
-                        "2. GPU drivers are up to date\n"
-                        "3. No other GPU-intensive applications are running"
-                    )
-                elif "out of memory" in stderr.lower() or "memory" in stderr.lower():
-                    raise UpscalingError(
-                        "GPU ran out of memory.\n\n"
-                        "Try closing other applications or using a lower resolution video."
-                    )
-                else:
-                    raise UpscalingError(
-                        f"Real-ESRGAN failed (code {self._process.returncode}):\n{stderr}"
-                    )
+            self._copy_duplicate_outputs(duplicates)
 
             # Final count of upscaled frames
             upscaled_count = self._count_output_frames()
 
             if upscaled_count == 0:
-                stderr = self._stderr_output
+                stderr = self.stderr_output
                 raise UpscalingError(
                     f"No frames were upscaled. Check GPU compatibility and driver versions.\n"
                     f"Details: {stderr}"
@@ -240,6 +444,10 @@ class Upscaler:
             raise UpscalingError(f"Failed to run Real-ESRGAN: {e}")
         finally:
             self._process = None
+            if duplicates:
+                for frame in duplicates:
+                    (duplicates_dir / frame.name).rename(frame)
+                duplicates_dir.rmdir()
 
 
 def upscale_frames(
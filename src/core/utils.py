@@ -6,16 +6,21 @@ All path operations use pathlib.Path for cross-platform compatibility (though th
 targets Windows specifically).
 """
 
+import shutil
 import subprocess
 import sys
-import json
 import re
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from fractions import Fraction
+from functools import lru_cache
 from pathlib import Path
 from dataclasses import dataclass
 from typing import Optional, Tuple
 
 
-@dataclass
+@dataclass(frozen=True)
 class VideoInfo:
     """Container for video metadata extracted via FFprobe."""
     width: int
@@ -42,6 +47,16 @@ class VulkanNotSupportedError(Exception):
     pass
 
 
+# Application root, resolved once at import. Binaries, models/ and temp/ sit
+# next to the executable, not in PyInstaller's sys._MEIPASS bundle folder.
+if getattr(sys, 'frozen', False):
+    # Running as compiled executable
+    _APP_DIR = Path(sys.executable).parent
+else:
+    # Running as script - go up from src/core/ to project root
+    _APP_DIR = Path(__file__).parent.parent.parent
+
+
 def get_app_directory() -> Path:
     """
     Get the application's root directory.
@@ -49,26 +64,75 @@ def get_app_directory() -> Path:
     When running as a PyInstaller bundle, this returns the directory containing
     the executable. When running as a script, returns the src/ parent directory.
     """
-    if getattr(sys, 'frozen', False):
-        # Running as compiled executable
-        return Path(sys.executable).parent
-    else:
-        # Running as script - go up from src/core/ to project root
-        return Path(__file__).parent.parent.parent
+    return _APP_DIR
 
 
+@lru_cache(maxsize=1)
 def get_temp_directory() -> Path:
     """
     Get the temporary directory for frame processing.
 
     Creates a 'temp' folder next to the executable/script for easy access
-    and debugging. The folder is created if it doesn't exist.
+    and debugging. The folder is created on the first call.
     """
     temp_dir = get_app_directory() / "temp"
     temp_dir.mkdir(exist_ok=True)
     return temp_dir
 
 
+# Marks temp directories renamed for deletion by discard_directory()
+TRASH_MARKER = ".trash."
+
+
+def discard_directory(path: Path, delete_in_place: bool = True) -> bool:
+    """
+    Delete a directory without waiting for it.
+
+    The directory is renamed first so it is gone from its old path at once,
+    then removed on a background thread. Deleting tens of thousands of frames
+    can take minutes on Windows. The thread is not a daemon, so the removal
+    still finishes if the application is closed; anything left behind anyway
+    is removed by sweep_trash_directories() on the next start.
+
+    Args:
+        path: Directory to delete. Nothing happens if it does not exist.
+        delete_in_place: If the rename fails, e.g. because a file in it is
+            still open, delete the directory at its old path in the
+            background. If False it is left alone instead, for callers that
+            are about to reuse the path.
+
+    Returns:
+        True if the directory was moved away or did not exist, False if
+        the rename failed.
+    """
+    trash = path.with_name(f"{path.name}{TRASH_MARKER}{uuid.uuid4().hex}")
+    try:
+        path.rename(trash)
+    except FileNotFoundError:
+        return True
+    except OSError:
+        # Still in use (e.g. a file held open)
+        if not delete_in_place:
+            return False
+        trash = path
+
+    threading.Thread(
+        target=shutil.rmtree,
+        args=(trash,),
+        kwargs={"ignore_errors": True},
+        daemon=False
+    ).start()
+    return trash != path
+
+
+def sweep_trash_directories() -> None:
+    """Remove directories left in the temp folder by an interrupted discard."""
+    for entry in get_temp_directory().iterdir():
+        if TRASH_MARKER in entry.name and entry.is_dir():
+            shutil.rmtree(entry, ignore_errors=True)
+
+
+@lru_cache(maxsize=1)
 def get_models_directory() -> Path:
     """
     Get the models directory where Real-ESRGAN model files are stored.
@@ -78,11 +142,13 @@ def get_models_directory() -> Path:
     return get_app_directory() / "models"
 
 
+@lru_cache(maxsize=1)
 def get_ffmpeg_path() -> Path:
     """
     Get the path to the FFmpeg executable.
 
-    Looks for ffmpeg.exe in the application directory.
+    Looks for ffmpeg.exe in the application directory. Once found, the path
+    is cached for the rest of the session.
 
     Raises:
         BinaryNotFoundError: If ffmpeg.exe is not found.
@@ -97,11 +163,13 @@ def get_ffmpeg_path() -> Path:
     return ffmpeg_path
 
 
+@lru_cache(maxsize=1)
 def get_ffprobe_path() -> Path:
     """
     Get the path to the FFprobe executable.
 
-    Looks for ffprobe.exe in the application directory.
+    Looks for ffprobe.exe in the application directory. Once found, the path
+    is cached for the rest of the session.
 
     Raises:
         BinaryNotFoundError: If ffprobe.exe is not found.
@@ -116,11 +184,13 @@ def get_ffprobe_path() -> Path:
     return ffprobe_path
 
 
+@lru_cache(maxsize=1)
 def get_realesrgan_path() -> Path:
     """
     Get the path to the Real-ESRGAN executable.
 
-    Looks for realesrgan-ncnn-vulkan.exe in the application directory.
+    Looks for realesrgan-ncnn-vulkan.exe in the application directory. Once found, the path
+    is cached for the rest of the session.
 
     Raises:
         BinaryNotFoundError: If the executable is not found.
@@ -136,10 +206,14 @@ def get_realesrgan_path() -> Path:
     return realesrgan_path
 
 
+@lru_cache(maxsize=16)
 def validate_models_exist(model_name: str = "realesr-animevideov3", scale: int = 2) -> Tuple[Path, Path]:
     """
     Validate that the required model files exist.
 
+    Found model files are cached per (model_name, scale) for the rest of the
+    session; a failed lookup is not cached and is checked again next time.
+
     Args:
         model_name: Name of the model (without scale suffix or extension).
         scale: Scale factor (2, 3, or 4) for models that have scale variants.
@@ -210,6 +284,9 @@ def get_video_info(video_path: Path) -> VideoInfo:
     """
     Extract video metadata using FFprobe.
 
+    Results are cached per file, keyed on its modification time and size, so
+    repeated calls for an unchanged video do not spawn FFprobe again.
+
     Args:
         video_path: Path to the video file.
 
@@ -219,16 +296,66 @@ def get_video_info(video_path: Path) -> VideoInfo:
     Raises:
         VideoValidationError: If video info cannot be extracted.
     """
+    try:
+        stat = Path(video_path).stat()
+    except OSError:
+        raise VideoValidationError(f"Input video not found: {video_path}")
+
+    return _probe_video(str(video_path), stat.st_mtime_ns, stat.st_size)
+
+
+def _to_float(value) -> Optional[float]:
+    """Convert an FFprobe field to float, or None if missing or unparsable."""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _parse_compact_output(output: str) -> dict:
+    """
+    Parse FFprobe's compact writer output into streams and format dicts.
+
+    Each line looks like "stream|width=1920|height=1080|...". Unavailable
+    values ("N/A") are dropped so callers see them as missing keys.
+    """
+    data = {"streams": [], "format": {}}
+
+    for line in output.splitlines():
+        section, *fields = line.strip().split("|")
+        entries = {}
+        for field in fields:
+            key, _, value = field.partition("=")
+            if value != "N/A":
+                entries[key] = value
+
+        if section == "stream":
+            data["streams"].append(entries)
+        elif section == "format":
+            data["format"] = entries
+
+    return data
+
+
+@lru_cache(maxsize=256)
+def _probe_video(video_path: str, mtime_ns: int, size: int) -> VideoInfo:
+    """
+    Run FFprobe on a video. Cached; mtime_ns and size only form the cache key.
+    """
     ffprobe_path = get_ffprobe_path()
 
-    # Build FFprobe command to get JSON output with stream info
+    # Build FFprobe command requesting only the fields used below, one
+    # key=value line per stream plus one for the container format. Chapters,
+    # tags and side data are never requested, so the output stays a few
+    # hundred bytes however long the video is and is parsed straight from memory
     cmd = [
         str(ffprobe_path),
         "-v", "quiet",
-        "-print_format", "json",
-        "-show_format",
-        "-show_streams",
-        str(video_path)
+        "-print_format", "compact",
+        "-show_entries",
+        "stream=codec_type,codec_name,width,height,r_frame_rate,nb_frames,duration"
+        ":format=duration",
+        video_path
     ]
 
     try:
@@ -245,12 +372,10 @@ def get_video_info(video_path: Path) -> VideoInfo:
                 f"FFprobe failed to read video:\n{result.stderr}"
             )
 
-        data = json.loads(result.stdout)
+        data = _parse_compact_output(result.stdout)
 
     except subprocess.TimeoutExpired:
         raise VideoValidationError("FFprobe timed out while reading video info")
-    except json.JSONDecodeError as e:
-        raise VideoValidationError(f"Failed to parse FFprobe output: {e}")
 
     # Find video stream
     video_stream = None
@@ -273,54 +398,28 @@ def get_video_info(video_path: Path) -> VideoInfo:
         raise VideoValidationError("Could not determine video dimensions")
 
     # Extract frame rate (can be fraction like "30000/1001")
-    fps_str = video_stream.get("r_frame_rate", "30/1")
     try:
-        if "/" in fps_str:
-            num, den = fps_str.split("/")
-            fps = float(num) / float(den)
-        else:
-            fps = float(fps_str)
+        fps = float(Fraction(video_stream.get("r_frame_rate", "30/1")))
     except (ValueError, ZeroDivisionError):
         fps = 30.0  # Default fallback
 
-    # Extract frame count - try multiple methods
-    frame_count = 0
+    # Durations are read once; either may be missing or unparsable
+    stream_duration = _to_float(video_stream.get("duration"))
+    format_duration = _to_float(data.get("format", {}).get("duration"))
+    known_duration = stream_duration or format_duration
 
-    # Method 1: Direct nb_frames field
-    if "nb_frames" in video_stream:
-        try:
-            frame_count = int(video_stream["nb_frames"])
-        except (ValueError, TypeError):
-            pass
-
-    # Method 2: Calculate from duration and fps
-    if frame_count == 0:
-        duration_str = video_stream.get("duration") or data.get("format", {}).get("duration")
-        if duration_str:
-            try:
-                duration = float(duration_str)
-                frame_count = int(duration * fps)
-            except (ValueError, TypeError):
-                pass
-
-    # Method 3: Use format duration
-    if frame_count == 0:
-        format_info = data.get("format", {})
-        if "duration" in format_info:
-            try:
-                duration = float(format_info["duration"])
-                frame_count = int(duration * fps)
-            except (ValueError, TypeError):
-                frame_count = 0
+    # Extract frame count: prefer nb_frames, else derive from duration and fps
+    frame_count = int(
+        _to_float(video_stream.get("nb_frames")) or (known_duration or 0.0) * fps
+    )
 
     # Get duration
-    duration = 0.0
-    duration_str = video_stream.get("duration") or data.get("format", {}).get("duration", "0")
-    try:
-        duration = float(duration_str)
-    except (ValueError, TypeError):
-        if frame_count > 0 and fps > 0:
-            duration = frame_count / fps
+    if known_duration is not None:
+        duration = known_duration
+    elif frame_count > 0 and fps > 0:
+        duration = frame_count / fps
+    else:
+        duration = 0.0
 
     # Get codec
     codec = video_stream.get("codec_name", "unknown")
@@ -368,36 +467,31 @@ def validate_all_dependencies() -> list[str]:
     """
     Validate all required dependencies are present.
 
+    The checks are independent file lookups, so they run concurrently to keep
+    startup fast when the application folder is on a slow or cold disk.
+
     Returns:
         List of error messages for missing dependencies. Empty list if all present.
     """
-    errors = []
-
-    # Check FFmpeg
-    try:
-        get_ffmpeg_path()
-    except BinaryNotFoundError as e:
-        errors.append(str(e))
-
-    # Check FFprobe
-    try:
-        get_ffprobe_path()
-    except BinaryNotFoundError as e:
-        errors.append(str(e))
+    checks = [
+        get_ffmpeg_path,        # FFmpeg
+        get_ffprobe_path,       # FFprobe
+        get_realesrgan_path,    # Real-ESRGAN
+        validate_models_exist,  # Models
+    ]
 
-    # Check Real-ESRGAN
-    try:
-        get_realesrgan_path()
-    except BinaryNotFoundError as e:
-        errors.append(str(e))
+    def run_check(check) -> Optional[str]:
+        try:
+            check()
+        except BinaryNotFoundError as e:
+            return str(e)
+        return None
 
-    # Check models
-    try:
-        validate_models_exist()
-    except BinaryNotFoundError as e:
-        errors.append(str(e))
+    # map() preserves order, so errors are reported in the same order as before
+    with ThreadPoolExecutor(max_workers=len(checks)) as executor:
+        results = list(executor.map(run_check, checks))
 
-    return errors
+    return [error for error in results if error is not None]
 
 
 def generate_output_path(input_path: Path, suffix: str = "_upscaled") -> Path:
@@ -438,6 +532,9 @@ def format_time(seconds: float) -> str:
         return f"{minutes}:{secs:02d}"
 
 
+_SIZE_UNITS = ('B', 'KB', 'MB', 'GB', 'TB', 'PB')
+
+
 def format_file_size(size_bytes: int) -> str:
     """
     Format bytes into human-readable size.
@@ -448,8 +545,10 @@ def format_file_size(size_bytes: int) -> str:
     Returns:
         Formatted string like "1.5 GB" or "256 MB"
     """
-    for unit in ['B', 'KB', 'MB', 'GB', 'TB']:
-        if size_bytes < 1024:
-            return f"{size_bytes:.1f} {unit}"
-        size_bytes /= 1024
-    return f"{size_bytes:.1f} PB"
+    if size_bytes <= 0:
+        return f"{size_bytes:.1f} B"
+
+    # Each unit step is 2**10, so the bit length picks the unit directly;
+    # fractions of a byte have bit length 0 and stay in bytes
+    unit_index = max(0, min((int(size_bytes).bit_length() - 1) // 10, len(_SIZE_UNITS) - 1))
+    return f"{size_bytes / (1 << (unit_index * 10)):.1f} {_SIZE_UNITS[unit_index]}"
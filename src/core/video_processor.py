@@ -9,16 +9,18 @@ Coordinates the complete video upscaling workflow:
 Runs as a QThread to keep the GUI responsive during processing.
 """
 
-import shutil
+import os
+import threading
 import time
 from pathlib import Path
 from typing import Optional
 from dataclasses import dataclass
 from enum import Enum, auto
 
-from PyQt6.QtCore import QThread, pyqtSignal
+from PyQt6.QtCore import QElapsedTimer, QThread, pyqtSignal
 
 from core.utils import (
+    discard_directory,
     get_temp_directory,
     get_video_info,
     validate_input_video,
@@ -26,9 +28,19 @@ from core.utils import (
     generate_output_path,
     VideoInfo
 )
-from core.frame_extractor import FrameExtractor, FrameExtractionError
+from core.frame_extractor import (
+    FrameExtractor,
+    FrameExtractionError,
+    cached_frames_directory,
+    sampled_video_info,
+)
 from core.upscaler import Upscaler, UpscalingError
-from core.video_assembler import VideoAssembler, VideoAssemblyError
+from core.video_assembler import (
+    VideoAssembler,
+    VideoAssemblyError,
+    default_parallel_segments,
+)
+from core.pipeline import ThreadedPipeline
 
 
 class ProcessingStage(Enum):
@@ -44,7 +56,7 @@ class ProcessingStage(Enum):
     CANCELLED = auto()
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class ProcessingProgress:
     """Container for processing progress information."""
     stage: ProcessingStage
@@ -55,6 +67,24 @@ class ProcessingProgress:
     estimated_remaining: float = -1.0
 
 
+def default_overlap_stages() -> bool:
+    """
+    Get whether extraction, upscaling and assembly should run concurrently.
+
+    Enabled by default; set the VIDEO_UPSCALER_OVERLAP_STAGES environment
+    variable to 0 to run the stages one after another.
+    """
+    return os.environ.get("VIDEO_UPSCALER_OVERLAP_STAGES", "1").strip() != "0"
+
+
+# ThreadedPipeline stage ids mapped to processing stages
+PIPELINE_STAGES = {
+    "extract": ProcessingStage.EXTRACTING,
+    "upscale": ProcessingStage.UPSCALING,
+    "assemble": ProcessingStage.ASSEMBLING,
+}
+
+
 class VideoProcessor(QThread):
     """
     Main video processing pipeline running on a background thread.
@@ -71,6 +101,8 @@ class VideoProcessor(QThread):
             Args: (error_message,)
         stage_changed: Emitted when processing stage changes.
             Args: (stage_name,)
+        stage_failed: Emitted before processing_error when a processing
+            stage raised. Args: (stage_name,)
     """
 
     # Qt signals for thread-safe GUI communication
@@ -78,6 +110,10 @@ class VideoProcessor(QThread):
     processing_complete = pyqtSignal(str)  # output_path
     processing_error = pyqtSignal(str)  # error_message
     stage_changed = pyqtSignal(str)  # stage_name
+    stage_failed = pyqtSignal(str)  # stage_name
+
+    # Minimum time between progress signals for one stage (~30 Hz)
+    PROGRESS_INTERVAL_MS = 33
 
     def __init__(
         self,
@@ -85,6 +121,10 @@ class VideoProcessor(QThread):
         output_path: Optional[Path] = None,
         scale: int = 2,
         model_name: str = "realesr-animevideov3",
+        batch_size: Optional[int] = None,
+        overlap_stages: Optional[bool] = None,
+        preview_fps: Optional[float] = None,
+        skip_duplicates: bool = False,
         parent=None
     ):
         """
@@ -95,6 +135,19 @@ class VideoProcessor(QThread):
             output_path: Optional path for output video. Auto-generated if None.
             scale: Upscale factor (2, 3, or 4).
             model_name: Name of the Real-ESRGAN model.
+            batch_size: Optional frames per Real-ESRGAN invocation. By default
+                every frame goes through one invocation, which loads the model
+                once and keeps the GPU fed through its load/proc/save threads.
+            overlap_stages: Run extraction, upscaling and assembly concurrently
+                on rolling batches of frames (see ThreadedPipeline), so the GPU
+                starts after the first batch is extracted. When False the
+                stages run one after another. Defaults to
+                default_overlap_stages().
+            preview_fps: Optional frame rate to sample the source at for a
+                quick preview; the output is encoded at that rate with the
+                full audio track. None upscales every frame.
+            skip_duplicates: Upscale byte-identical frames (static shots,
+                held animation frames) only once and reuse the result.
             parent: Optional parent QObject.
         """
         super().__init__(parent)
@@ -103,16 +156,33 @@ class VideoProcessor(QThread):
         self.output_path = Path(output_path) if output_path else None
         self.scale = scale
         self.model_name = model_name
+        self.batch_size = batch_size
+        if overlap_stages is None:
+            overlap_stages = default_overlap_stages()
+        self.overlap_stages = overlap_stages
+        self.preview_fps = preview_fps
+        self.skip_duplicates = skip_duplicates
 
         self._cancelled = False
         self._current_stage = ProcessingStage.IDLE
         self._start_time: float = 0
-        self._stage_start_time: float = 0
+        self._stage_timer = QElapsedTimer()
+
+        # Throttles progress signals; last emit time (ms) per stage name
+        self._emit_timer = QElapsedTimer()
+        self._last_emit_ms: dict[str, int] = {}
 
         # Processing components (created during run)
         self._extractor: Optional[FrameExtractor] = None
         self._upscaler: Optional[Upscaler] = None
         self._assembler: Optional[VideoAssembler] = None
+        self._pipeline: Optional[ThreadedPipeline] = None
+
+        # Latest (current, total) per stage while stages overlap
+        self._stage_progress: dict[ProcessingStage, tuple[int, int]] = {}
+        # Guards the current stage: overlapped stages report from their own
+        # threads while run() moves through the outer stages
+        self._stage_lock = threading.RLock()
 
         # Temporary directories
         self._temp_base: Optional[Path] = None
@@ -145,30 +215,64 @@ class VideoProcessor(QThread):
             self._upscaler.cancel()
         if self._assembler:
             self._assembler.cancel()
+        if self._pipeline:
+            self._pipeline.cancel()
 
     def _set_stage(self, stage: ProcessingStage) -> None:
         """Update the current processing stage and emit signal."""
-        self._current_stage = stage
-        self._stage_start_time = time.time()
-        self.stage_changed.emit(stage.name)
+        with self._stage_lock:
+            self._current_stage = stage
+            self._stage_timer.start()
+            self.stage_changed.emit(stage.name)
 
     def _on_progress(self, current: int, total: int, message: str) -> None:
         """
         Handle progress updates from processing components.
 
-        Calculates ETA and emits progress signal to GUI.
+        Emits progress signal to GUI, labelled with the current stage.
         """
         stage_name = self._current_stage.name.capitalize()
+        if self._should_emit(stage_name, current, total):
+            self.progress_updated.emit(current, total, stage_name, message)
+
+    def _on_stage_progress(self, stage_id: str, current: int, total: int, message: str) -> None:
+        """
+        Handle progress from the overlapped pipeline.
 
-        # Calculate elapsed and estimated time
-        elapsed = time.time() - self._stage_start_time
-        if current > 0:
-            rate = elapsed / current
-            remaining = rate * (total - current)
-        else:
-            remaining = -1
+        Every stage reports under its own name. The current stage is the
+        latest one that has made progress, or the first stage before any
+        has. Progress must be non-zero because every stage reports (0, total)
+        as soon as it is set up, long before frames reach it.
+        """
+        stage = PIPELINE_STAGES[stage_id]
+        with self._stage_lock:
+            self._stage_progress[stage] = (current, total)
+            started = [s for s, (done, _) in self._stage_progress.items() if done > 0]
+            if started:
+                leading = max(started, key=lambda s: s.value)
+            else:
+                leading = min(PIPELINE_STAGES.values(), key=lambda s: s.value)
+            if leading != self._current_stage:
+                self._set_stage(leading)
 
-        self.progress_updated.emit(current, total, stage_name, message)
+        stage_name = stage.name.capitalize()
+        if self._should_emit(stage_name, current, total):
+            self.progress_updated.emit(current, total, stage_name, message)
+
+    def _should_emit(self, stage_name: str, current: int, total: int) -> bool:
+        """
+        Rate-limit progress signals to PROGRESS_INTERVAL_MS per stage.
+
+        Components report every frame, far more often than the GUI can show,
+        and each signal is queued across threads. A stage's final update
+        always goes through so the GUI sees it complete.
+        """
+        now = self._emit_timer.elapsed()
+        last = self._last_emit_ms.get(stage_name)
+        if current < total and last is not None and now - last < self.PROGRESS_INTERVAL_MS:
+            return False
+        self._last_emit_ms[stage_name] = now
+        return True
 
     def _setup_temp_directories(self) -> None:
         """Create temporary directories for frame processing."""
@@ -177,21 +281,108 @@ class VideoProcessor(QThread):
         self._temp_base = get_temp_directory() / f"job_{timestamp}"
         self._temp_base.mkdir(parents=True, exist_ok=True)
 
-        self._frames_input_dir = self._temp_base / "input_frames"
+        # Extracted frames live in the frame cache, outside the job directory,
+        # so processing the same source again can reuse them
+        self._frames_input_dir = cached_frames_directory(
+            self.input_path, self.preview_fps
+        )
         self._frames_output_dir = self._temp_base / "output_frames"
 
-        self._frames_input_dir.mkdir(exist_ok=True)
         self._frames_output_dir.mkdir(exist_ok=True)
 
     def _cleanup_temp_directories(self) -> None:
-        """Remove temporary directories and files."""
-        if self._temp_base and self._temp_base.exists():
+        """Remove temporary directories and files in the background."""
+        if self._temp_base:
             try:
-                shutil.rmtree(self._temp_base)
+                discard_directory(self._temp_base)
             except Exception:
                 # Best effort cleanup - don't fail on cleanup errors
                 pass
 
+    def _run_sequential(self, video_info: VideoInfo) -> Path:
+        """Run extraction, upscaling and assembly one after another."""
+        # Setup temp directories
+        self._setup_temp_directories()
+
+        # Stage 2: Frame Extraction
+        self._set_stage(ProcessingStage.EXTRACTING)
+
+        self._extractor = FrameExtractor(
+            self.input_path,
+            self._frames_input_dir,
+            self._on_progress,
+            self.preview_fps
+        )
+
+        extracted_count = self._extractor.extract()
+
+        if self._cancelled:
+            raise Exception("Processing cancelled")
+
+        # Stage 3: AI Upscaling
+        self._set_stage(ProcessingStage.UPSCALING)
+
+        self._upscaler = Upscaler(
+            self._frames_input_dir,
+            self._frames_output_dir,
+            self.scale,
+            self.model_name,
+            self._on_progress,
+            self.batch_size,
+            self.skip_duplicates
+        )
+
+        upscaled_count = self._upscaler.upscale()
+
+        if self._cancelled:
+            raise Exception("Processing cancelled")
+
+        # Stage 4: Video Assembly
+        self._set_stage(ProcessingStage.ASSEMBLING)
+
+        self._assembler = VideoAssembler(
+            self._frames_output_dir,
+            self.input_path,
+            self.output_path,
+            sampled_video_info(video_info, self.preview_fps),
+            self._on_progress,
+            parallel_segments=default_parallel_segments()
+        )
+
+        output_path = self._assembler.assemble()
+
+        if self._cancelled:
+            raise Exception("Processing cancelled")
+
+        return output_path
+
+    def _run_overlapped(self) -> Path:
+        """Run extraction, upscaling and assembly concurrently."""
+        self._stage_progress = {}
+        self._set_stage(ProcessingStage.EXTRACTING)
+
+        self._pipeline = ThreadedPipeline(
+            self.input_path,
+            self.output_path,
+            self.scale,
+            self.model_name,
+            batch_size=self.batch_size,
+            stage_callback=self._on_stage_progress,
+            preview_fps=self.preview_fps,
+            skip_duplicates=self.skip_duplicates
+        )
+
+        if self._cancelled:
+            raise Exception("Processing cancelled")
+
+        try:
+            return self._pipeline.run()
+        except Exception:
+            # Stages stopped by cancel() raise their own errors
+            if self._cancelled:
+                raise Exception("Processing cancelled") from None
+            raise
+
     def run(self) -> None:
         """
         Execute the video processing pipeline.
@@ -207,6 +398,8 @@ class VideoProcessor(QThread):
         """
         self._cancelled = False
         self._start_time = time.time()
+        self._emit_timer.start()
+        self._last_emit_ms = {}
 
         try:
             # Stage 1: Validation
@@ -236,54 +429,10 @@ class VideoProcessor(QThread):
             if self._cancelled:
                 raise Exception("Processing cancelled")
 
-            # Setup temp directories
-            self._setup_temp_directories()
-
-            # Stage 2: Frame Extraction
-            self._set_stage(ProcessingStage.EXTRACTING)
-
-            self._extractor = FrameExtractor(
-                self.input_path,
-                self._frames_input_dir,
-                self._on_progress
-            )
-
-            extracted_count = self._extractor.extract()
-
-            if self._cancelled:
-                raise Exception("Processing cancelled")
-
-            # Stage 3: AI Upscaling
-            self._set_stage(ProcessingStage.UPSCALING)
-
-            self._upscaler = Upscaler(
-                self._frames_input_dir,
-                self._frames_output_dir,
-                self.scale,
-                self.model_name,
-                self._on_progress
-            )
-
-            upscaled_count = self._upscaler.upscale()
-
-            if self._cancelled:
-                raise Exception("Processing cancelled")
-
-            # Stage 4: Video Assembly
-            self._set_stage(ProcessingStage.ASSEMBLING)
-
-            self._assembler = VideoAssembler(
-                self._frames_output_dir,
-                self.input_path,
-                self.output_path,
-                video_info,
-                self._on_progress
-            )
-
-            output_path = self._assembler.assemble()
-
-            if self._cancelled:
-                raise Exception("Processing cancelled")
+            if self.overlap_stages:
+                output_path = self._run_overlapped()
+            else:
+                output_path = self._run_sequential(video_info)
 
             # Stage 5: Cleanup
             self._set_stage(ProcessingStage.CLEANUP)
@@ -298,16 +447,19 @@ class VideoProcessor(QThread):
             self.processing_complete.emit(str(output_path))
 
         except FrameExtractionError as e:
+            self.stage_failed.emit(ProcessingStage.EXTRACTING.name)
             self._set_stage(ProcessingStage.ERROR)
             self._cleanup_temp_directories()
             self.processing_error.emit(f"Frame extraction failed:\n{e}")
 
         except UpscalingError as e:
+            self.stage_failed.emit(ProcessingStage.UPSCALING.name)
             self._set_stage(ProcessingStage.ERROR)
             self._cleanup_temp_directories()
             self.processing_error.emit(f"AI upscaling failed:\n{e}")
 
         except VideoAssemblyError as e:
+            self.stage_failed.emit(ProcessingStage.ASSEMBLING.name)
             self._set_stage(ProcessingStage.ERROR)
             self._cleanup_temp_directories()
             self.processing_error.emit(f"Video assembly failed:\n{e}")
@@ -318,6 +470,8 @@ class VideoProcessor(QThread):
                 self._cleanup_temp_directories()
                 self.processing_error.emit("Processing was cancelled")
             else:
+                if self._current_stage in PIPELINE_STAGES.values():
+                    self.stage_failed.emit(self._current_stage.name)
                 self._set_stage(ProcessingStage.ERROR)
                 self._cleanup_temp_directories()
                 self.processing_error.emit(f"Processing failed:\n{e}")
@@ -8,7 +8,7 @@ progress display, and processing controls.
 from pathlib import Path
 from typing import Optional
 
-from PyQt6.QtCore import Qt
+from PyQt6.QtCore import Qt, QSettings, QTimer
 from PyQt6.QtWidgets import (
     QMainWindow,
     QWidget,
@@ -19,7 +19,7 @@ from PyQt6.QtWidgets import (
     QLabel,
     QLineEdit,
     QFrame,
-    QScrollArea,
+    QCheckBox,
 )
 
 from gui.widgets import (
@@ -30,6 +30,7 @@ from gui.widgets import (
 )
 from gui.styles import get_stylesheet
 from core.video_processor import VideoProcessor
+from core.upscaler import default_batch_size
 from core.utils import (
     validate_input_video,
     validate_all_dependencies,
@@ -38,6 +39,19 @@ from core.utils import (
     VideoValidationError,
 )
 
+# Frame rate of a quick preview run
+PREVIEW_FPS = 5.0
+
+# QSettings key remembering the "Skip repeated frames" option
+SKIP_DUPLICATES_KEY = "options/skip_duplicates"
+
+# Map processing stage names to progress step IDs
+STAGE_STEPS = {
+    "EXTRACTING": "extract",
+    "UPSCALING": "upscale",
+    "ASSEMBLING": "assemble",
+}
+
 
 class MainWindow(QMainWindow):
     """
@@ -54,7 +68,15 @@ class MainWindow(QMainWindow):
 
         self._processor: Optional[VideoProcessor] = None
         self._is_processing = False
-        self._current_stage = ""
+        # Set when the window was closed while a job was still stopping
+        self._close_when_stopped = False
+        self._failed_step = ""
+        # Steps already started / completed; stages can overlap
+        self._started_steps: set[str] = set()
+        self._completed_steps: set[str] = set()
+        # Latest progress per stage, applied once per event loop pass
+        self._pending_progress: dict[str, tuple[int, int, str]] = {}
+        self._progress_flush_scheduled = False
         self._output_path: Optional[Path] = None
 
         self._setup_window()
@@ -68,15 +90,10 @@ class MainWindow(QMainWindow):
         self.setStyleSheet(get_stylesheet())
 
     def _setup_ui(self) -> None:
-        # Central widget with scroll area for small windows
-        scroll = QScrollArea()
-        scroll.setWidgetResizable(True)
-        scroll.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
-        self.setCentralWidget(scroll)
-
-        # Main container
+        # Main container; the layout fits the minimum window size, so it
+        # sits directly in the window rather than in a scroll area
         container = QWidget()
-        scroll.setWidget(container)
+        self.setCentralWidget(container)
 
         layout = QVBoxLayout(container)
         layout.setContentsMargins(24, 24, 24, 24)
@@ -134,6 +151,30 @@ class MainWindow(QMainWindow):
 
         layout.addLayout(scale_row)
 
+        # Options
+        options_row = QHBoxLayout()
+        options_row.setContentsMargins(0, 0, 0, 0)
+        options_row.setSpacing(16)
+
+        self._skip_duplicates_check = QCheckBox("Skip repeated frames")
+        self._skip_duplicates_check.setToolTip(
+            "Upscale identical frames (static shots, held animation) only once"
+        )
+        self._skip_duplicates_check.setChecked(
+            QSettings().value(SKIP_DUPLICATES_KEY, False, type=bool)
+        )
+        options_row.addWidget(self._skip_duplicates_check)
+
+        self._preview_check = QCheckBox("Quick preview")
+        self._preview_check.setToolTip(
+            f"Upscale only {PREVIEW_FPS:g} frames per second, saved with a "
+            f"\"_preview\" suffix, to check the result before a full run"
+        )
+        options_row.addWidget(self._preview_check)
+        options_row.addStretch()
+
+        layout.addLayout(options_row)
+
         # Separator
         layout.addWidget(self._create_separator())
 
@@ -149,17 +190,11 @@ class MainWindow(QMainWindow):
         layout.addStretch()
 
         # Single action button (changes based on state)
-        button_layout = QHBoxLayout()
-        button_layout.addStretch()
-
         self._action_btn = QPushButton("Start Upscaling")
         self._action_btn.setProperty("class", "primary")
         self._action_btn.setMinimumWidth(160)
         self._action_btn.clicked.connect(self._on_action_clicked)
-        button_layout.addWidget(self._action_btn)
-
-        button_layout.addStretch()
-        layout.addLayout(button_layout)
+        layout.addWidget(self._action_btn, alignment=Qt.AlignmentFlag.AlignHCenter)
 
     def _create_separator(self) -> QFrame:
         sep = QFrame()
@@ -171,6 +206,7 @@ class MainWindow(QMainWindow):
     def _connect_signals(self) -> None:
         self._input_picker.file_selected.connect(self._on_input_selected)
         self._scale_toggle.scale_changed.connect(self._on_scale_changed)
+        self._skip_duplicates_check.toggled.connect(self._on_skip_duplicates_toggled)
 
     def _on_scale_changed(self, scale: int) -> None:
         # Update output path with new scale
@@ -179,6 +215,9 @@ class MainWindow(QMainWindow):
             self._output_path = generate_output_path(Path(input_path), f"_{scale}x_upscaled")
             self._output_edit.setText(str(self._output_path))
 
+    def _on_skip_duplicates_toggled(self, checked: bool) -> None:
+        QSettings().setValue(SKIP_DUPLICATES_KEY, checked)
+
     def _on_output_changed(self, text: str) -> None:
         # Update output path when user edits it
         if text.strip():
@@ -248,81 +287,124 @@ class MainWindow(QMainWindow):
                 QMessageBox.critical(self, "Missing Dependencies", "\n\n".join(errors))
                 return
 
-            # Check if output exists
-            if self._output_path.exists():
+            # A preview never overwrites the full-quality output
+            output_path = self._output_path
+            if self._preview_check.isChecked():
+                output_path = output_path.with_name(
+                    f"{output_path.stem}_preview{output_path.suffix}"
+                )
+
+            # Check if output exists (one stat; slow on network drives)
+            try:
+                output_path.stat()
+                output_exists = True
+            except OSError:
+                output_exists = False
+
+            if output_exists:
                 result = QMessageBox.question(
                     self, "File Exists",
-                    f"Output file already exists:\n{self._output_path.name}\n\nOverwrite?",
+                    f"Output file already exists:\n{output_path.name}\n\nOverwrite?",
                     QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
                 )
                 if result != QMessageBox.StandardButton.Yes:
                     return
 
-            self._start_processing(Path(input_path), self._output_path)
+            self._start_processing(Path(input_path), output_path)
 
     def _start_processing(self, input_path: Path, output_path: Path) -> None:
         self._is_processing = True
         self._set_processing_ui_state(True)
         self._progress.reset()
+        self._started_steps.clear()
+        self._completed_steps.clear()
+        self._pending_progress.clear()
 
         scale = self._scale_toggle.get_scale()
 
         self._processor = VideoProcessor(
             input_path=input_path,
             output_path=output_path,
-            scale=scale
+            scale=scale,
+            batch_size=default_batch_size(),
+            preview_fps=PREVIEW_FPS if self._preview_check.isChecked() else None,
+            skip_duplicates=self._skip_duplicates_check.isChecked()
         )
 
         self._processor.progress_updated.connect(self._on_progress_updated)
         self._processor.processing_complete.connect(self._on_processing_complete)
         self._processor.processing_error.connect(self._on_processing_error)
         self._processor.stage_changed.connect(self._on_stage_changed)
+        self._processor.stage_failed.connect(self._on_stage_failed)
 
         self._processor.start()
 
     def _set_processing_ui_state(self, processing: bool) -> None:
+        # Repaint once after all widgets have changed state
+        self.setUpdatesEnabled(False)
         self._input_picker.set_enabled(not processing)
         self._scale_toggle.set_enabled(not processing)
+        self._skip_duplicates_check.setEnabled(not processing)
+        self._preview_check.setEnabled(not processing)
         self._output_edit.setEnabled(not processing)
 
         if processing:
             self._action_btn.setText("Cancel")
-            self._action_btn.setProperty("class", "danger")
+            button_class = "danger"
         else:
             self._action_btn.setText("Start Upscaling")
-            self._action_btn.setProperty("class", "primary")
+            button_class = "primary"
 
-        # Force style refresh
-        self._action_btn.style().unpolish(self._action_btn)
-        self._action_btn.style().polish(self._action_btn)
+        # Re-polishing re-applies the stylesheet rules, so only do it when
+        # the class actually changes
+        if self._action_btn.property("class") != button_class:
+            self._action_btn.setProperty("class", button_class)
+            self._action_btn.style().unpolish(self._action_btn)
+            self._action_btn.style().polish(self._action_btn)
+
+        self.setUpdatesEnabled(True)
 
     def _on_progress_updated(self, current: int, total: int, stage: str, message: str) -> None:
-        # Map stage names to step IDs
-        stage_map = {
-            "EXTRACTING": "extract",
-            "UPSCALING": "upscale",
-            "ASSEMBLING": "assemble",
-        }
-
-        step_id = stage_map.get(stage.upper())
-        if step_id:
-            if step_id != self._current_stage:
-                # New stage started
-                if self._current_stage:
-                    self._progress.complete_step(self._current_stage)
-                self._current_stage = step_id
+        # Progress signals can queue up faster than the bars repaint; keep
+        # only the latest per stage and apply them together
+        self._pending_progress[stage] = (current, total, message)
+        if not self._progress_flush_scheduled:
+            self._progress_flush_scheduled = True
+            QTimer.singleShot(0, self._flush_progress)
+
+    def _flush_progress(self) -> None:
+        self._progress_flush_scheduled = False
+        pending, self._pending_progress = self._pending_progress, {}
+        for stage, (current, total, message) in pending.items():
+            self._apply_progress(current, total, stage, message)
+
+    def _apply_progress(self, current: int, total: int, stage: str, message: str) -> None:
+        step_id = STAGE_STEPS.get(stage.upper())
+        if step_id and step_id not in self._completed_steps:
+            # Stages may overlap, so each step is started on its first update
+            # and completed once it reaches its total
+            if step_id not in self._started_steps:
+                self._started_steps.add(step_id)
                 self._progress.start_step(step_id, total)
 
             self._progress.update_step(step_id, current, total)
+            if total > 0 and current >= total:
+                self._completed_steps.add(step_id)
+                self._progress.complete_step(step_id)
 
     def _on_processing_complete(self, output_path: str) -> None:
+        self._flush_progress()
         self._is_processing = False
         self._set_processing_ui_state(False)
 
         # Complete remaining steps
-        if self._current_stage:
-            self._progress.complete_step(self._current_stage)
-        self._current_stage = ""
+        for step_id in self._started_steps - self._completed_steps:
+            self._progress.complete_step(step_id)
+        self._failed_step = ""
+
+        if self._close_when_stopped:
+            # Keep the processor referenced until its thread has finished
+            return
 
         self._processor = None
 
@@ -332,12 +414,17 @@ class MainWindow(QMainWindow):
         )
 
     def _on_processing_error(self, error_message: str) -> None:
+        self._flush_progress()
         self._is_processing = False
         self._set_processing_ui_state(False)
 
-        if self._current_stage:
-            self._progress.error_step(self._current_stage)
-        self._current_stage = ""
+        if self._failed_step:
+            self._progress.error_step(self._failed_step)
+        self._failed_step = ""
+
+        if self._close_when_stopped:
+            # Keep the processor referenced until its thread has finished
+            return
 
         self._processor = None
 
@@ -346,8 +433,18 @@ class MainWindow(QMainWindow):
     def _on_stage_changed(self, stage_name: str) -> None:
         pass  # Handled in progress_updated
 
+    def _on_stage_failed(self, stage_name: str) -> None:
+        # Stages overlap, so the last one to report progress is not
+        # necessarily the one that failed
+        self._failed_step = STAGE_STEPS.get(stage_name, "")
+
     def closeEvent(self, event) -> None:
         if self._is_processing:
+            if self._close_when_stopped:
+                # Already closing once the processor has stopped
+                event.ignore()
+                return
+
             result = QMessageBox.question(
                 self, "Processing in Progress",
                 "Video processing is still running.\n\nQuit anyway?",
@@ -356,7 +453,17 @@ class MainWindow(QMainWindow):
             if result == QMessageBox.StandardButton.Yes:
                 if self._processor:
                     self._processor.cancel()
-                    self._processor.wait()
+                    # Don't hang the window if a child process ignores the
+                    # cancel; the cancel itself escalates to a kill
+                    if not self._processor.wait(5000):
+                        # Destroying a QThread that is still running aborts
+                        # the application, so close once it has finished
+                        self._close_when_stopped = True
+                        self._processor.finished.connect(self.close)
+                        self._action_btn.setText("Stopping...")
+                        self._action_btn.setEnabled(False)
+                        event.ignore()
+                        return
                 event.accept()
             else:
                 event.ignore()
@@ -4,11 +4,13 @@ Custom PyQt6 widgets for Video Upscaler.
 Provides reusable widgets for file selection and progress display.
 """
 
+import os
 import time
+import zlib
 from pathlib import Path
 from typing import Optional
 
-from PyQt6.QtCore import Qt, pyqtSignal
+from PyQt6.QtCore import Qt, QSettings, QTimer, pyqtSignal
 from PyQt6.QtWidgets import (
     QWidget,
     QHBoxLayout,
@@ -18,12 +20,54 @@ from PyQt6.QtWidgets import (
     QProgressBar,
     QLabel,
     QFileDialog,
+    QButtonGroup,
     QFrame,
     QSizePolicy,
 )
 
 from core.utils import format_time
 
+# Starting directory for file pickers with no remembered directory
+_DEFAULT_HOME = str(Path.home())
+
+
+def _vbox(
+    parent: QWidget,
+    margins: tuple[int, int, int, int] = (0, 0, 0, 0),
+    spacing: int = 0
+) -> QVBoxLayout:
+    """Create a vertical layout on parent with the given margins and spacing."""
+    layout = QVBoxLayout(parent)
+    layout.setContentsMargins(*margins)
+    layout.setSpacing(spacing)
+    return layout
+
+
+def _hbox(
+    parent: QWidget,
+    margins: tuple[int, int, int, int] = (0, 0, 0, 0),
+    spacing: int = 0
+) -> QHBoxLayout:
+    """Create a horizontal layout on parent with the given margins and spacing."""
+    layout = QHBoxLayout(parent)
+    layout.setContentsMargins(*margins)
+    layout.setSpacing(spacing)
+    return layout
+
+
+def _set_style_class(widget: QWidget, style_class: str) -> None:
+    """
+    Set a widget's stylesheet class and re-apply the stylesheet to it.
+
+    Re-polishing re-matches every stylesheet rule against the widget, so it
+    is skipped when the class is unchanged.
+    """
+    if widget.property("class") == style_class:
+        return
+    widget.setProperty("class", style_class)
+    widget.style().unpolish(widget)
+    widget.style().polish(widget)
+
 
 class FilePickerWidget(QWidget):
     """
@@ -34,6 +78,14 @@ class FilePickerWidget(QWidget):
 
     file_selected = pyqtSignal(str)
 
+    # Skip per-folder custom icon lookups and symlink resolution, which make
+    # the Windows dialog slow in folders with many subdirectories. The
+    # native dialog is kept.
+    DIALOG_OPTIONS = (
+        QFileDialog.Option.DontUseCustomDirectoryIcons
+        | QFileDialog.Option.DontResolveSymlinks
+    )
+
     def __init__(
         self,
         label: str = "File:",
@@ -45,15 +97,28 @@ class FilePickerWidget(QWidget):
 
         self._file_filter = file_filter
         self._mode = mode
-        self._last_directory = str(Path.home())
+
+        # The last browsed directory is remembered across sessions, per
+        # picker kind (crc32 gives a key that is stable between runs)
+        self._settings_key = (
+            f"last_directory/{mode}/{zlib.crc32(file_filter.encode()):08x}"
+        )
+        last_directory = QSettings().value(self._settings_key, "", type=str)
+        if not last_directory or not os.path.isdir(last_directory):
+            last_directory = _DEFAULT_HOME
+        self._last_directory = last_directory
+
+        # Path last reported through file_selected
+        self._selected_path = ""
+
+        # Created on first browse and reused afterwards
+        self._dialog: Optional[QFileDialog] = None
 
         self._setup_ui(label)
         self._setup_drag_drop()
 
     def _setup_ui(self, label: str) -> None:
-        layout = QVBoxLayout(self)
-        layout.setContentsMargins(0, 0, 0, 0)
-        layout.setSpacing(6)
+        layout = _vbox(self, spacing=6)
 
         # Label
         self._label = QLabel(label)
@@ -67,7 +132,7 @@ class FilePickerWidget(QWidget):
         # Path input
         self._path_input = QLineEdit()
         self._path_input.setPlaceholderText("Select a file or drag and drop here...")
-        self._path_input.textChanged.connect(self._on_text_changed)
+        self._path_input.editingFinished.connect(self._on_editing_finished)
         input_layout.addWidget(self._path_input, stretch=1)
 
         # Browse button
@@ -91,33 +156,75 @@ class FilePickerWidget(QWidget):
         urls = event.mimeData().urls()
         if urls:
             file_path = urls[0].toLocalFile()
+            if file_path:
+                self._remember_directory(file_path)
             self.set_path(file_path)
 
+    def _get_dialog(self) -> QFileDialog:
+        """
+        Get this picker's file dialog, creating it on first use.
+
+        Keeping one dialog avoids rebuilding it, and re-scanning the folder,
+        on every browse.
+        """
+        if self._dialog is None:
+            dialog = QFileDialog(self)
+            dialog.setOptions(self.DIALOG_OPTIONS)
+            dialog.setNameFilters(self._file_filter.split(";;"))
+            if self._mode == "open":
+                dialog.setWindowTitle("Select File")
+                dialog.setAcceptMode(QFileDialog.AcceptMode.AcceptOpen)
+                dialog.setFileMode(QFileDialog.FileMode.ExistingFile)
+            else:
+                dialog.setWindowTitle("Save File")
+                dialog.setAcceptMode(QFileDialog.AcceptMode.AcceptSave)
+                dialog.setFileMode(QFileDialog.FileMode.AnyFile)
+            self._dialog = dialog
+        return self._dialog
+
     def _on_browse_clicked(self) -> None:
-        if self._mode == "open":
-            file_path, _ = QFileDialog.getOpenFileName(
-                self, "Select File", self._last_directory, self._file_filter
-            )
-        else:
-            file_path, _ = QFileDialog.getSaveFileName(
-                self, "Save File", self._last_directory, self._file_filter
-            )
+        dialog = self._get_dialog()
+        dialog.setDirectory(self._last_directory)
+        if not dialog.exec():
+            return
 
+        selected = dialog.selectedFiles()
+        file_path = selected[0] if selected else ""
         if file_path:
-            self._last_directory = str(Path(file_path).parent)
+            self._remember_directory(file_path)
             self.set_path(file_path)
 
-    def _on_text_changed(self, text: str) -> None:
-        self.file_selected.emit(text)
+    def _remember_directory(self, file_path: str) -> None:
+        directory = str(Path(file_path).parent)
+        if directory != self._last_directory:
+            self._last_directory = directory
+            QSettings().setValue(self._settings_key, directory)
+
+    def _on_editing_finished(self) -> None:
+        # Typed paths are reported once editing ends (Enter or focus out)
+        # rather than per keystroke, as each report probes the file.
+        # Leaving the field without changing it reports nothing.
+        path = self.get_path()
+        if path != self._selected_path:
+            self._select(path)
+
+    def _select(self, path: str) -> None:
+        self._selected_path = path
+        self.file_selected.emit(path)
 
     def get_path(self) -> str:
         return self._path_input.text().strip()
 
     def set_path(self, path: str) -> None:
+        # Re-selecting the current path would only repeat the probe
+        if path == self._selected_path and self._path_input.text() == path:
+            return
         self._path_input.setText(path)
+        self._select(path)
 
     def clear(self) -> None:
         self._path_input.clear()
+        self._select("")
 
     def set_enabled(self, enabled: bool) -> None:
         self._path_input.setEnabled(enabled)
@@ -131,6 +238,12 @@ class StepProgressBar(QWidget):
     Shows: 15% [345/13543] (10:43) in the center of the bar.
     """
 
+    # Minimum seconds between repaints while the percentage is unchanged
+    PAINT_INTERVAL = 0.1
+
+    # Weight of the newest sample in the smoothed frame rate
+    RATE_SMOOTHING = 0.2
+
     def __init__(self, step_name: str, parent: Optional[QWidget] = None):
         super().__init__(parent)
 
@@ -138,13 +251,21 @@ class StepProgressBar(QWidget):
         self._start_time: Optional[float] = None
         self._current = 0
         self._total = 0
+        self._total_str = "0"  # _total with thousands separators
+        self._last_paint_time = 0.0
+        self._last_percent = -1
+
+        # Smoothed frames/second and the sample it was last updated from
+        self._rate = 0.0
+        self._rate_time = 0.0
+        self._rate_current = 0
+        self._eta_str = "--:--"
+        self._eta_percent = -1
 
         self._setup_ui()
 
     def _setup_ui(self) -> None:
-        layout = QVBoxLayout(self)
-        layout.setContentsMargins(0, 4, 0, 4)
-        layout.setSpacing(4)
+        layout = _vbox(self, margins=(0, 4, 0, 4), spacing=4)
 
         # Step label
         self._step_label = QLabel(self._step_name)
@@ -164,29 +285,75 @@ class StepProgressBar(QWidget):
         self._start_time = None
         self._current = 0
         self._total = 0
+        self._total_str = "0"
+        self._last_percent = -1
         self._progress_bar.setValue(0)
         self._progress_bar.setFormat("Waiting...")
-        self._progress_bar.setProperty("class", "")
-        self._progress_bar.style().unpolish(self._progress_bar)
-        self._progress_bar.style().polish(self._progress_bar)
+        _set_style_class(self._progress_bar, "")
 
     def start(self, total: int) -> None:
-        self._start_time = time.time()
+        self._start_time = time.monotonic()
         self._total = total
+        self._total_str = f"{total:,}"
         self._current = 0
+        self._last_percent = -1
+        self._rate = 0.0
+        self._rate_time = self._start_time
+        self._rate_current = 0
+        self._eta_str = "--:--"
+        self._eta_percent = -1
         self._progress_bar.setValue(0)
         self._update_format()
 
     def update_progress(self, current: int, total: int) -> None:
         self._current = current
-        self._total = total if total > 0 else self._total
+        if total > 0 and total != self._total:
+            self._total = total
+            self._total_str = f"{total:,}"
+
+        # Updates arrive per frame; repaint when the percentage moves, and
+        # otherwise at most every PAINT_INTERVAL to keep the count live
+        percent = int((current / self._total) * 100) if self._total > 0 else 0
+        now = time.monotonic()
+        if percent == self._last_percent and now - self._last_paint_time < self.PAINT_INTERVAL:
+            return
+        self._last_percent = percent
+        self._last_paint_time = now
 
-        if self._total > 0:
-            percent = int((current / self._total) * 100)
+        # Timed repaints often land on the same percentage; only the text
+        # needs refreshing then
+        if self._total > 0 and percent != self._progress_bar.value():
             self._progress_bar.setValue(percent)
 
+        self._update_eta(now, percent)
         self._update_format()
 
+    def _update_eta(self, now: float, percent: int) -> None:
+        """
+        Fold the frames done since the last repaint into the smoothed rate.
+
+        An exponential moving average follows speed changes (e.g. a busy
+        GPU) without the jitter of per-update rates. The displayed ETA is
+        only re-estimated when the percentage changes.
+        """
+        if self._start_time is None:
+            return
+
+        elapsed = now - self._rate_time
+        frames = self._current - self._rate_current
+        if elapsed > 0 and frames >= 0:
+            sample = frames / elapsed
+            if self._rate > 0:
+                sample = self.RATE_SMOOTHING * sample + (1 - self.RATE_SMOOTHING) * self._rate
+            self._rate = sample
+        self._rate_time = now
+        self._rate_current = self._current
+
+        if percent != self._eta_percent:
+            self._eta_percent = percent
+            if self._rate > 0:
+                self._eta_str = format_time((self._total - self._current) / self._rate)
+
     def _update_format(self) -> None:
         if self._total == 0:
             self._progress_bar.setFormat("Waiting...")
@@ -194,54 +361,54 @@ class StepProgressBar(QWidget):
 
         percent = int((self._current / self._total) * 100) if self._total > 0 else 0
 
-        # Calculate ETA
-        eta_str = "--:--"
-        if self._start_time and self._current > 0:
-            elapsed = time.time() - self._start_time
-            rate = elapsed / self._current
-            remaining = rate * (self._total - self._current)
-            eta_str = format_time(remaining)
-
         # Format: 15% [345/13543] (10:43)
         self._progress_bar.setFormat(
-            f"{percent}% [{self._current:,}/{self._total:,}] ({eta_str})"
+            f"{percent}% [{self._current:,}/{self._total_str}] ({self._eta_str})"
         )
 
     def set_complete(self) -> None:
+        self._last_percent = -1
         self._progress_bar.setValue(100)
         self._progress_bar.setFormat("100% - Complete")
-        self._progress_bar.setProperty("class", "complete")
-        self._progress_bar.style().unpolish(self._progress_bar)
-        self._progress_bar.style().polish(self._progress_bar)
+        _set_style_class(self._progress_bar, "complete")
 
     def set_error(self) -> None:
         self._progress_bar.setFormat("Error")
-        self._progress_bar.setProperty("class", "error")
-        self._progress_bar.style().unpolish(self._progress_bar)
-        self._progress_bar.style().polish(self._progress_bar)
+        _set_style_class(self._progress_bar, "error")
 
     def set_active(self, active: bool) -> None:
         """Highlight this step as currently active."""
-        self._step_label.setProperty("class", "step-label-active" if active else "step-label")
-        self._step_label.style().unpolish(self._step_label)
-        self._step_label.style().polish(self._step_label)
+        _set_style_class(self._step_label, "step-label-active" if active else "step-label")
 
 
 class MultiStepProgress(QWidget):
     """
     Container for multiple step progress bars.
+
+    Step updates are buffered and applied to the bars by a timer, so any
+    number of updates between two ticks costs one bar update per step.
+    All methods must be called on the GUI thread; VideoProcessor's queued
+    signals already deliver worker progress there.
     """
 
+    # Milliseconds between applying buffered step updates (~10 Hz)
+    FLUSH_INTERVAL_MS = 100
+
     def __init__(self, parent: Optional[QWidget] = None):
         super().__init__(parent)
 
         self._steps: dict[str, StepProgressBar] = {}
+        # Latest (current, total) per step, waiting for the next flush
+        self._pending: dict[str, tuple[int, int]] = {}
+
+        self._flush_timer = QTimer(self)
+        self._flush_timer.setInterval(self.FLUSH_INTERVAL_MS)
+        self._flush_timer.timeout.connect(self._flush)
+
         self._setup_ui()
 
     def _setup_ui(self) -> None:
-        layout = QVBoxLayout(self)
-        layout.setContentsMargins(0, 0, 0, 0)
-        layout.setSpacing(8)
+        layout = _vbox(self, spacing=8)
 
         # Create progress bars for each step
         steps = [
@@ -255,7 +422,18 @@ class MultiStepProgress(QWidget):
             self._steps[step_id] = progress
             layout.addWidget(progress)
 
+    def _flush(self) -> None:
+        pending, self._pending = self._pending, {}
+        if not pending:
+            # Nothing arrived since the last tick; wait for the next update
+            self._flush_timer.stop()
+            return
+        for step_id, (current, total) in pending.items():
+            self._steps[step_id].update_progress(current, total)
+
     def reset(self) -> None:
+        self._flush_timer.stop()
+        self._pending.clear()
         for step in self._steps.values():
             step.reset()
 
@@ -268,15 +446,22 @@ class MultiStepProgress(QWidget):
 
     def update_step(self, step_id: str, current: int, total: int) -> None:
         if step_id in self._steps:
-            self._steps[step_id].update_progress(current, total)
+            self._pending[step_id] = (current, total)
+            if not self._flush_timer.isActive():
+                self._flush_timer.start()
 
     def complete_step(self, step_id: str) -> None:
         if step_id in self._steps:
+            # A buffered update must not overwrite the completed state
+            self._pending.pop(step_id, None)
             self._steps[step_id].set_complete()
             self._steps[step_id].set_active(False)
 
     def error_step(self, step_id: str) -> None:
         if step_id in self._steps:
+            # Show how far the step got before marking it failed
+            if step_id in self._pending:
+                self._steps[step_id].update_progress(*self._pending.pop(step_id))
             self._steps[step_id].set_error()
 
 
@@ -291,12 +476,14 @@ class ScaleToggle(QWidget):
         super().__init__(parent)
         self._buttons: dict[int, QPushButton] = {}
         self._current_scale = 2
+        # Exclusive group: Qt unchecks the other buttons itself
+        self._group = QButtonGroup(self)
+        self._group.setExclusive(True)
+        self._group.idClicked.connect(self._on_scale_clicked)
         self._setup_ui()
 
     def _setup_ui(self) -> None:
-        layout = QHBoxLayout(self)
-        layout.setContentsMargins(0, 0, 0, 0)
-        layout.setSpacing(0)
+        layout = _hbox(self)
 
         scales = [2, 3, 4]
 
@@ -306,7 +493,7 @@ class ScaleToggle(QWidget):
             btn.setChecked(scale == 2)
             btn.setProperty("class", "scale-toggle")
             btn.setMinimumHeight(36)
-            btn.clicked.connect(lambda checked, s=scale: self._on_scale_clicked(s))
+            self._group.addButton(btn, scale)
 
             # Round corners only on ends
             if scale == scales[0]:
@@ -320,19 +507,19 @@ class ScaleToggle(QWidget):
             layout.addWidget(btn)
 
     def _on_scale_clicked(self, scale: int) -> None:
+        # Clicking the selected button still emits idClicked
+        if scale == self._current_scale:
+            return
         self._current_scale = scale
-        for s, btn in self._buttons.items():
-            btn.setChecked(s == scale)
         self.scale_changed.emit(scale)
 
     def get_scale(self) -> int:
         return self._current_scale
 
     def set_scale(self, scale: int) -> None:
-        if scale in self._buttons:
+        if scale in self._buttons and scale != self._current_scale:
             self._current_scale = scale
-            for s, btn in self._buttons.items():
-                btn.setChecked(s == scale)
+            self._buttons[scale].setChecked(True)
 
     def set_enabled(self, enabled: bool) -> None:
         for btn in self._buttons.values():
@@ -346,12 +533,12 @@ class VideoInfoLabel(QWidget):
 
     def __init__(self, parent: Optional[QWidget] = None):
         super().__init__(parent)
+        # Values behind the current text; setText relayouts even if unchanged
+        self._last_info: Optional[tuple] = None
         self._setup_ui()
 
     def _setup_ui(self) -> None:
-        layout = QHBoxLayout(self)
-        layout.setContentsMargins(0, 0, 0, 0)
-        layout.setSpacing(16)
+        layout = _hbox(self, spacing=16)
 
         self._info_label = QLabel("No video selected")
         self._info_label.setProperty("class", "video-info")
@@ -359,6 +546,7 @@ class VideoInfoLabel(QWidget):
         layout.addStretch()
 
     def clear(self) -> None:
+        self._last_info = None
         self._info_label.setText("No video selected")
 
     def update_info(
@@ -370,6 +558,11 @@ class VideoInfoLabel(QWidget):
         frame_count: int,
         has_audio: bool
     ) -> None:
+        info = (width, height, round(fps, 1), int(duration), frame_count, has_audio)
+        if info == self._last_info:
+            return
+        self._last_info = info
+
         audio_str = "Audio" if has_audio else "No Audio"
         self._info_label.setText(
             f"{width}x{height} | {fps:.1f}fps | {format_time(duration)} | "
@@ -7,6 +7,7 @@ Supports 2x, 3x, and 4x upscaling for photorealistic video content.
 Usage:
     python main.py              # Launch GUI application
     python main.py --help       # Show help
+    python main.py --version    # Show version
 
 When packaged as an executable:
     VideoUpscaler.exe           # Launch GUI application
@@ -14,6 +15,7 @@ When packaged as an executable:
 
 import sys
 import os
+import threading
 from pathlib import Path
 
 # Add the src directory to the path for imports when running as script
@@ -23,14 +25,57 @@ if not getattr(sys, 'frozen', False):
         sys.path.insert(0, str(src_dir))
 
 
+APP_NAME = "Video Upscaler"
+APP_VERSION = "1.0.0"
+
+ICON_PATH = str(Path(__file__).parent.parent / "icon.ico")
+
+HELP_TEXT = f"""\
+{APP_NAME} {APP_VERSION}
+AI-powered video upscaling using Real-ESRGAN.
+
+Usage: main.py [--help] [--version]
+
+Without options, launches the GUI application.
+
+Options:
+  -h, --help     Show this help message and exit
+  --version      Show the version and exit
+"""
+
+
+def _handle_info_flags(args: list[str]) -> bool:
+    """
+    Print help or version information if requested.
+
+    Checked before PyQt6 is imported, so these never pay for loading Qt.
+
+    Returns:
+        True if a flag was handled and the application should exit.
+    """
+    if "-h" in args or "--help" in args:
+        print(HELP_TEXT, end="")
+        return True
+    if "--version" in args:
+        print(f"{APP_NAME} {APP_VERSION}")
+        return True
+    return False
+
+
 def main():
     """Main entry point for the Video Upscaler application."""
-    # Import PyQt6 here to allow the path setup above to complete first
+    if _handle_info_flags(sys.argv[1:]):
+        sys.exit(0)
+
+    # Import PyQt6 here to allow the path setup above to complete first,
+    # and so --help/--version never load Qt
     from PyQt6.QtWidgets import QApplication
     from PyQt6.QtCore import Qt
     from PyQt6.QtGui import QIcon
 
     from gui.main_window import MainWindow
+    from core.utils import sweep_trash_directories
+    from core.frame_extractor import prune_frame_cache
 
     # Enable high DPI scaling
     QApplication.setHighDpiScaleFactorRoundingPolicy(
@@ -39,14 +84,21 @@ def main():
 
     # Create application
     app = QApplication(sys.argv)
-    app.setApplicationName("Video Upscaler")
-    app.setApplicationVersion("1.0.0")
+    app.setApplicationName(APP_NAME)
+    app.setApplicationVersion(APP_VERSION)
     app.setOrganizationName("VideoUpscaler")
 
     # Set application icon if available
-    icon_path = Path(__file__).parent.parent / "icon.ico"
-    if icon_path.exists():
-        app.setWindowIcon(QIcon(str(icon_path)))
+    if os.path.isfile(ICON_PATH):
+        app.setWindowIcon(QIcon(ICON_PATH))
+
+    # Finish deleting temp files an earlier session left behind and drop
+    # frames cached too long ago, without holding up the window
+    def clean_up_temp_directory():
+        sweep_trash_directories()
+        prune_frame_cache()
+
+    threading.Thread(target=clean_up_temp_directory, daemon=True).start()
 
     # Create and show main window
     window = MainWindow()